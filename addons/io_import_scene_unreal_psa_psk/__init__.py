@@ -0,0 +1,1591 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+bl_info = {
+    "name": "Import Unreal Skeleton Mesh (.psk)/Animation Set (.psa)",
+    "author": "Darknet, flufy3d, camg188, befzz",
+    "version": (2, 6, 2),
+    "blender": (2, 64, 0),
+    "location": "File > Import > Skeleton Mesh (.psk)/Animation Set (.psa)",
+    "description": "Import Skeleleton Mesh/Animation Data",
+    "warning": "",
+    "wiki_url": "http://wiki.blender.org/index.php/Extensions:2.5/Py/"
+                "Scripts/Import-Export/Unreal_psk_psa",
+    "category": "Import-Export",
+}
+
+"""
+Version': '2.0' ported by Darknet
+
+Unreal Tournament PSK file to Blender mesh converter V1.0
+Author: D.M. Sturgeon (camg188 at the elYsium forum), ported by Darknet
+Imports a *psk file to a new mesh
+
+-No UV Texutre
+-No Weight
+-No Armature Bones
+-No Material ID
+-Export Text Log From Current Location File (Bool )
+"""
+
+"""
+Version': '2.6.*' edited by befzz
+Github: https://github.com/Befzz/blender3d_import_psk_psa
+- No Scale support.
+"""
+
+import bpy
+import os
+import sys
+import math
+import re
+import collections
+import multiprocessing
+import concurrent.futures
+import numpy as np
+from mathutils import Matrix
+from bpy.props import (FloatProperty,
+                        StringProperty,
+                        BoolProperty,
+                        CollectionProperty,
+                        IntProperty,
+                        EnumProperty,
+                        PointerProperty )
+from bpy.types import UIList
+from .pskpsa import (util_bytes_to_str,
+                     psk_read,
+                     class_psa_reader,
+                     util_psa_scan_actions)
+from .stats import class_import_stats
+from .debuglog import class_debug_log
+from .cache import class_parse_cache
+from .skeleton import (util_skeleton_from_psk,
+                       util_bone_roll_to_vectors,
+                       class_skeleton,
+                       class_bone_name_index,
+                       util_psa_action_key_indexes)
+from .animkeys import (util_psa_action_keys,
+                       util_psa_key_frames,
+                       KEY_BYTES)
+
+# class_import_stats of last pskimport() or psaimport() call (for scripts)
+last_import_stats = None
+
+# stats_output -> file extension of stats written next to imported file
+IMPORT_STATS_OUTPUT_EXTS = {
+    'JSON':     '.stats.json',
+    'TRACE':    '.trace.json',
+}
+
+# workers of psaimport(): files are read and actions are solved in them
+PSA_IMPORT_WORKERS = os.cpu_count() or 1
+# pose bones * frames of psa import, from which actions are solved in forked processes
+# (smaller imports are solved in threads: fork costs more than it saves)
+PSA_PROCESS_POOL_MIN_SIZE = 2000000
+
+def util_import_stats_done(stats, filepath, stats_output):
+    '''store stats of finished import, write it next to file if stats_output is 'JSON' or 'TRACE' '''
+    global last_import_stats
+    stats.end_all()
+    stats.filepath = filepath
+    last_import_stats = stats
+    
+    ext = IMPORT_STATS_OUTPUT_EXTS.get(stats_output)
+    if ext is None:
+        return
+    try:
+        if stats_output == 'TRACE':
+            stats.write_chrome_trace(filepath + ext)
+        else:
+            stats.write_json(filepath + ext)
+    except IOError as error:
+        print("Can not write import stats:", error)
+    else:
+        print("Import stats:", filepath + ext)
+
+def util_parse_cache(opts):
+    '''class_parse_cache for import options, None if cache is not used'''
+    if not opts.use_cache:
+        return None
+    return class_parse_cache(bpy.path.abspath(opts.cache_dir) if opts.cache_dir else None,
+                             opts.cache_size * 1024 * 1024)
+
+def utils_set_mode(mode):
+    if bpy.ops.object.mode_set.poll():
+            bpy.ops.object.mode_set(mode=mode, toggle = False)
+
+def select_all(select):
+    if select:
+        actionString = 'SELECT'
+    else:
+        actionString = 'DESELECT'
+
+    if bpy.ops.object.select_all.poll():
+        bpy.ops.object.select_all(action=actionString)
+
+    if bpy.ops.mesh.select_all.poll():
+        bpy.ops.mesh.select_all(action=actionString)
+
+    if bpy.ops.pose.select_all.poll():
+        bpy.ops.pose.select_all(action=actionString)
+
+def util_ui_show_msg(msg):
+    if bpy.app.background:
+        # no UI to show popup
+        print("[PSA/PSK Importer] " + msg.replace("\n", " "))
+        return
+    bpy.ops.error.message_popup('INVOKE_DEFAULT', message = msg)
+        
+def util_gen_name_part(filepath):
+    '''strip path and extension from path'''
+    return re.match(r'.*[/\\]([^/\\]+?)(\..{2,5})?$', filepath).group(1)
+
+def pskimport(filepath, bImportmesh, bImportbone, bDebugLogPSK, bImportsingleuv,
+              stats = None, stats_output = 'NONE', cache = None):
+    '''stats: optional class_import_stats, gets time, peak memory and item counts of import phases.
+    stats_output: 'NONE', 'JSON' or 'TRACE' - write stats next to file.
+    cache: optional class_parse_cache for decoded chunks.'''
+    if not bImportbone and not bImportmesh:
+        util_ui_show_msg("Nothing to do.\nSet something for import.")
+        return False
+    
+    print ("--------------------------------------------------")
+    print ("---------SCRIPT EXECUTING PYTHON IMPORTER---------")
+    print ("--------------------------------------------------")
+    print (" Debug Enabled:", bDebugLogPSK)
+    print (" Importing file:", filepath)
+
+    if stats is None:
+        stats = class_import_stats()
+
+    #file may not exist
+    stats.begin('read')
+    try:
+        # mesh chunks are skipped in Skel mode
+        psk = psk_read(filepath, stats, cache, mesh = bImportmesh)
+    except IOError:
+        stats.end_all()
+        util_ui_show_msg('Error while opening file for reading:\n  "'+filepath+'"')
+        return False
+    except ValueError as error:
+        stats.end_all()
+        util_ui_show_msg(str(error))
+        return False
+    stats.end()
+    
+    # log does nothing if not bDebugLogPSK
+    log = class_debug_log(filepath + ".txt" if bDebugLogPSK else None)
+        
+    #=================================================
+    #         VChunkHeader Struct
+    # ChunkID|TypeFlag|DataSize|DataCount
+    # 0      |1       |2       |3
+    #=================================================
+    def printlog_header(name):
+        # chunk of class_psk_data attribute
+        if name in psk.data_chunks:
+            log.chunk_header(psk.data_chunks[name])
+
+    # file name w/out extension
+    gen_name_part = util_gen_name_part(filepath)
+    gen_names = {
+        'armature_object':  gen_name_part + '.ao',
+        'armature_data':    gen_name_part + '.ad',
+            'mesh_object':  gen_name_part + '.mo',
+            'mesh_data':    gen_name_part + '.md'
+    }
+    if bImportmesh:
+        mesh_data = bpy.data.meshes.new(gen_names['mesh_data'])
+        log.write("New Mesh Data = " + mesh_data.name + "\n")
+    #================================================================================================== 
+    # General
+    #================================================================================================== 
+    # file header is checked by psk_read()
+    log.chunk_header(psk.chunks[0])
+
+    #================================================================================================== 
+    # Points (Vertices)
+    #================================================================================================== 
+    #PNTS0000 ( VPoint )
+    printlog_header('points')
+    if bImportmesh:
+        verts = psk.points['co']
+        log.table(verts)
+
+    #VTXNORMS, pskx: normal of every point
+    printlog_header('normals')
+    if bImportmesh:
+        log.table(psk.normals['normal'])
+            
+    #================================================================================================== 
+    # Wedges (UV)
+    #================================================================================================== 
+    # https://github.com/gildor2/UModel/blob/master/Exporters/Psk.h
+    # for struct of VVertex
+    #
+    #VTXW0000 ( VVertex )
+    printlog_header('wedges')
+    
+    if bImportmesh:
+        wedges = psk.wedges
+        uv_material_indexes = np.unique(wedges['mat_index']).tolist()
+        #UVCoords record format = [pntIndx, U coord, v coord]
+        log.write("[pntIndx, U coord, v coord]\n");
+        log.table(wedges['point_index'], wedges['u'], wedges['v'])
+
+    #VERTEXCOLOR, pskx: color of every wedge
+    printlog_header('colors')
+    if bImportmesh:
+        log.table(psk.colors['color'])
+
+    #EXTRAUVS0, EXTRAUVS1, ... ( VMeshUV ), pskx: uv of every wedge
+    if bImportmesh:
+        extra_uvs_chunks = [chunk for chunk in psk.chunks if util_bytes_to_str(chunk[0]).startswith("EXTRAUVS")]
+        for (chunk, extra_uvs) in zip(extra_uvs_chunks, psk.extra_uvs):
+            log.chunk_header(chunk)
+            log.table(extra_uvs['u'], extra_uvs['v'])
+           
+    #================================================================================================== 
+    # Faces
+    #================================================================================================== 
+    #FACE0000
+    printlog_header('faces')
+    if bImportmesh:
+        #PSK FACE0000 fields: WdgIdx1|WdgIdx2|WdgIdx3|MatIdx|AuxMatIdx|SmthGrp
+        #associate MatIdx to an image, associate SmthGrp to a material
+        tris = psk.faces
+        log.write("nWdgIdx1\tWdgIdx2\tWdgIdx3\tMatIdx\tAuxMatIdx\tSmthGrp \n")
+        log.table(tris['wedge_index'], tris['mat_index'], tris['aux_mat_index'], tris['smoothing_groups'])
+
+        # wedge indexes of face in reversed order: (C, B, A)
+        face_wedges = tris['wedge_index'][:, ::-1]
+        # point indexes of faces
+        faces = wedges['point_index'][face_wedges]
+        # (u, 1 - v) of every face corner
+        face_uvs = np.empty(face_wedges.shape + (2,), dtype = np.float32)
+        face_uvs[..., 0] = wedges['u'][face_wedges]
+        face_uvs[..., 1] = 1.0 - wedges['v'][face_wedges]
+        face_mat_indexes = tris['mat_index']
+        # faces count per material
+        mat_groups = np.bincount(face_mat_indexes)
+
+        log.write("Using Materials to represent PSK Smoothing Groups...\n")
+    
+    #================================================================================================== 
+    # Materials
+    #================================================================================================== 
+    #MATT0000
+    printlog_header('materials')
+    
+    if bImportmesh:
+        stats.begin('materials', len(psk.materials))
+        print("-- Materials -- (index, name, faces)")
+        # printlog(" - Not importing any material data now. PSKs are texture wrapped! \n")
+        materials = []
+        
+        for (counter, MaterialNameRaw) in enumerate(psk.materials['name'].tolist()):
+            
+            materialname = util_bytes_to_str( MaterialNameRaw )
+            matdata = bpy.data.materials.get(materialname)
+            if matdata is None:
+                matdata = bpy.data.materials.new( materialname )
+            materials.append( matdata)
+            mesh_data.materials.append( matdata )
+            if counter < len(mat_groups) and mat_groups[counter] > 0:
+                print("%i: %s" % (counter, materialname), mat_groups[counter])
+        stats.end()
+
+    #================================================================================================== 
+    # Bones (VBone .. VJointPos )
+    #================================================================================================== 
+    #REFSKEL0 - Name|Flgs|NumChld|PrntIdx|Qw|Qx|Qy|Qz|LocX|LocY|LocZ|Lngth|XSize|YSize|ZSize
+    printlog_header('bones')
+    stats.begin('bones', len(psk.bones))
+
+    log.write("Name\tFlgs\tNumChld\tPrntIdx\tQx\tQy\tQz\tQw\tLocX\tLocY\tLocZ\tLngth\tXSize\tYSize\tZSize\n")
+    log.table(psk.bones['name'], psk.bones['flags'], psk.bones['num_children'], psk.bones['parent_index'],
+              psk.bones['quat'], psk.bones['pos'], psk.bones['length'], psk.bones['size'])
+
+    # parents, local rotations and positions as arrays, hierarchy order
+    skeleton = util_skeleton_from_psk(psk.bones,
+                                      [util_bytes_to_str(name_raw) for name_raw in psk.bones['name'].tolist()])
+    stats.end()
+    print('-- Bones --')
+    print('Count: %i' % len(skeleton))
+    #================================================================================================
+    # Blender armature
+    #================================================================================================
+    
+    # obj = None
+    # for obj in bpy.context.scene.objects:
+        # if type(obj.data) is bpy.types.Armature:
+            # armObj = obj
+            # break
+    
+    # force create new armature if need
+    if bImportbone:
+        stats.begin('armature', len(skeleton))
+        armature_data = bpy.data.armatures.new(gen_names['armature_data'])
+        armature_obj = bpy.data.objects.new(gen_names['armature_object'], armature_data)
+
+        bpy.context.scene.objects.link(armature_obj)
+        #bpy.ops.object.mode_set(mode='OBJECT')
+
+        select_all(False)
+        armature_obj.select = True
+        
+        #set current armature to edit the bone
+        bpy.context.scene.objects.active = armature_obj
+        
+        # TODO: options for axes and x_ray?
+        armature_data.show_axes = True
+        armature_obj.show_x_ray = True
+
+        # print("creating bone(s)")
+        
+        #Go to edit mode for the bones
+        utils_set_mode('EDIT')
+        
+        # rest matrices of all bones in armature space, in order of creation
+        order = skeleton.order
+        bone_matrices = skeleton.global_matrices()[order]
+        heads = bone_matrices[:, :3, 3]
+        # x axis of bone is direction to tail, y axis gives roll
+        tail_dirs = bone_matrices[:, :3, 0] / np.linalg.norm(bone_matrices[:, :3, 0], axis = 1)[:, np.newaxis]
+        tail_ups = bone_matrices[:, :3, 1] / np.linalg.norm(bone_matrices[:, :3, 1], axis = 1)[:, np.newaxis]
+        tails = heads + tail_dirs * bpy.context.scene.psk_import.bonesize
+        rolls = util_bone_roll_to_vectors(tail_dirs, tail_ups)
+        
+        # parents are created before children, edit_bones[i] is bone i of file
+        armature_edit_bones = armature_data.edit_bones
+        edit_bones = [None] * len(skeleton)
+        parent_indexes = skeleton.parent_indexes.tolist()
+        for bone_index in order.tolist():
+            edit_bone = armature_edit_bones.new(skeleton.names[bone_index])
+            parent_index = parent_indexes[bone_index]
+            if parent_index >= 0:
+                edit_bone.parent = edit_bones[parent_index]
+            edit_bones[bone_index] = edit_bone
+        
+        # edit bones of new armature are in order of creation
+        bones_true = np.ones(len(skeleton), dtype = np.int32)
+        armature_edit_bones.foreach_set("head", heads.astype(np.float32).ravel())
+        armature_edit_bones.foreach_set("tail", tails.astype(np.float32).ravel())
+        armature_edit_bones.foreach_set("roll", rolls.astype(np.float32))
+        armature_edit_bones.foreach_set("use_connect", np.zeros(len(skeleton), dtype = np.int32))
+        armature_edit_bones.foreach_set("use_inherit_rotation", bones_true)
+        armature_edit_bones.foreach_set("use_inherit_scale", bones_true)
+        armature_edit_bones.foreach_set("use_local_location", bones_true)
+        if len(armature_edit_bones):
+            armature_edit_bones.active = armature_edit_bones[-1]
+        stats.end()
+            
+    #bpy.context.scene.update()
+    #==================================================================================================
+    #END BONE DATA BUILD
+    #==================================================================================================
+    '''
+    if bImportmesh:
+        VtxCol = []
+        bones_count = len(skeleton)
+        for x in range(bones_count):
+            #change the overall darkness of each material in a range between 0.1 and 0.9
+            tmpVal = ((float(x) + 1.0) / bones_count * 0.7) + 0.1
+            tmpVal = int(tmpVal * 256)
+            tmpCol = [tmpVal, tmpVal, tmpVal, 0]
+            #Change the color of each material slightly
+            if x % 3 == 0:
+                if tmpCol[0] < 128:
+                    tmpCol[0] += 60
+                else:
+                    tmpCol[0] -= 60
+            if x % 3 == 1:
+                if tmpCol[1] < 128:
+                    tmpCol[1] += 60
+                else:
+                    tmpCol[1] -= 60
+            if x % 3 == 2:
+                if tmpCol[2] < 128:
+                    tmpCol[2] += 60
+                else:
+                    tmpCol[2] -= 60
+            #Add the material to the mesh
+            VtxCol.append(tmpCol)
+    '''
+    #================================================================================================== 
+    # Influences (Bone Weight)
+    #================================================================================================== 
+    #RAWW0000 (VRawBoneInfluence)(Weight|PntIdx|BoneIdx)
+    printlog_header('influences')
+
+    if bImportmesh:
+        RWghts = psk.influences
+
+        # sort by point index (stable, as list.sort)
+        RWghts = RWghts[np.argsort(RWghts['point_index'], kind='mergesort')]
+        log.write("Vertex point and groups count = " + str(len(RWghts)) + "\n")
+        log.write("PntIdx|BoneIdx|Weight\n")
+        log.table(RWghts['point_index'], RWghts['bone_index'], RWghts['weight'], sep = '|')
+
+    #MRPHINFO (VMorphInfo)(Name|NumVertices), MRPHDATA (VMorphData)(PositionDelta|TangentZDelta|PointIdx), pskx
+    printlog_header('morph_infos')
+    printlog_header('morph_deltas')
+    if bImportmesh:
+        log.table(psk.morph_deltas['point_index'], psk.morph_deltas['position_delta'], sep = '|')
+
+    """
+    for x in range(len(Tmsh.faces)):
+        for y in range(len(Tmsh.faces[x].v)):
+            #find v in RWghts[n][0]
+            findVal = Tmsh.faces[x].v[y].index
+            n = 0
+            while findVal != RWghts[n][0]:
+                n = n + 1
+            TmpCol = VtxCol[RWghts[n][1]]
+            #check if a vertex has more than one influence
+            if n != len(RWghts) - 1:
+                if RWghts[n][0] == RWghts[n + 1][0]:
+                    #if there is more than one influence, use the one with the greater influence
+                    #for simplicity only 2 influences are checked, 2nd and 3rd influences are usually very small
+                    if RWghts[n][2] < RWghts[n + 1][2]:
+                        TmpCol = VtxCol[RWghts[n + 1][1]]
+        Tmsh.faces[x].col.append(NMesh.Col(TmpCol[0], TmpCol[1], TmpCol[2], 0))
+    """
+    log.close()
+    #================================================================================================== 
+    # Building Mesh
+    #================================================================================================== 
+    if bImportmesh:
+        stats.begin('mesh', len(faces))
+        mesh_data.vertices.add(len(verts))
+        mesh_data.loops.add(faces.size)
+        mesh_data.polygons.add(len(faces))
+        mesh_data.vertices.foreach_set("co", verts.ravel())
+        # every polygon is a triangle, loops are in the same order as faces corners
+        mesh_data.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+        mesh_data.polygons.foreach_set("loop_start", np.arange(0, faces.size, 3, dtype = np.int32))
+        mesh_data.polygons.foreach_set("loop_total", np.full(len(faces), 3, dtype = np.int32))
+
+        # for face in mesh_data.polygons:
+            # .use_smooth is True or False - but facesmooth contains an int
+            # TODO FIXME still incorrect
+            # if facesmooth[face.index] > 0:
+                # face.use_smooth = True
+
+        utils_set_mode('OBJECT')
+        stats.end()
+
+    #===================================================================================================
+    # UV Setup
+    #===================================================================================================
+    if bImportmesh:
+        stats.begin('uv')
+        # (u, v) of every loop
+        loop_uvs = face_uvs.reshape(-1, 2)
+        
+        if bImportsingleuv:
+            uvmap = mesh_data.uv_textures.new(name = "psk_uv_map_single")
+            print("-- UV Single --\n" + uvmap.name)
+            mesh_data.uv_layers[uvmap.name].data.foreach_set("uv", loop_uvs.ravel())
+            mesh_data.polygons.foreach_set("material_index", face_mat_indexes.astype(np.int32))
+        else: #or make single UV map
+            print("-- UV Multi --")
+            use_material_name = False
+            if len(uv_material_indexes) == len(materials):
+                use_material_name = True
+                
+            # creating different uv maps, if imported uv data have different uv_texture_id 
+            # uv map N gets uvs of faces with MatIndex N, other faces get zeros
+            loop_mat_indexes = np.repeat(face_mat_indexes, 3)
+            for i in range(len(uv_material_indexes)):
+                
+                if use_material_name:
+                    uv_name = materials[i].name + ".uv"
+                else:
+                    uv_name = "psk_uv_multi_" + str(i)
+                uv = mesh_data.uv_textures.new(name=uv_name)
+                print("%i: %s" % (i, uv.name))
+                
+                uv_data = np.where((loop_mat_indexes == i)[:, np.newaxis], loop_uvs, 0.0)
+                mesh_data.uv_layers[uv.name].data.foreach_set("uv", uv_data.astype(np.float32).ravel())
+                
+            #assign material to face, if there is uv map for it
+            mesh_data.polygons.foreach_set("material_index",
+                    np.where(face_mat_indexes < len(uv_material_indexes), face_mat_indexes, 0).astype(np.int32))
+        #end if bImportsingleuv
+
+        # extra uv sets of pskx, same loop order as wedge uvs
+        for (counter, extra_uvs) in enumerate(psk.extra_uvs):
+            if len(extra_uvs) != len(wedges):
+                print("Extra UV set %i skipped: %i uvs for %i wedges" % (counter, len(extra_uvs), len(wedges)))
+                continue
+            uv = mesh_data.uv_textures.new(name = "psk_uv_extra_" + str(counter))
+            if uv is None:
+                print("Extra UV set %i skipped: no free uv map" % counter)
+                continue
+            print("Extra %i: %s" % (counter, uv.name))
+            extra_face_uvs = np.empty(face_wedges.shape + (2,), dtype = np.float32)
+            extra_face_uvs[..., 0] = extra_uvs['u'][face_wedges]
+            extra_face_uvs[..., 1] = 1.0 - extra_uvs['v'][face_wedges]
+            mesh_data.uv_layers[uv.name].data.foreach_set("uv", extra_face_uvs.ravel())
+        stats.end(len(mesh_data.uv_layers))
+
+        # pskx wedge colors, same loop order as wedge uvs (rgb in color map, alpha in gray map, if used)
+        if len(psk.colors) == len(wedges) and len(faces):
+            stats.begin('colors', faces.size)
+            loop_colors = psk.colors['color'][face_wedges].reshape(-1, 4)
+            color_maps = [("psk_vertex_color", loop_colors[:, :3])]
+            if (loop_colors[:, 3] != 255).any():
+                color_maps.append(("psk_vertex_alpha", np.repeat(loop_colors[:, 3:], 3, axis = 1)))
+            for (color_name, color_data) in color_maps:
+                color_layer = mesh_data.vertex_colors.new(name = color_name)
+                if color_layer is None:
+                    print("Vertex colors skipped: no free color map")
+                    break
+                color_layer.data.foreach_set("color", (color_data.ravel() / np.float32(255.0)).astype(np.float32))
+            stats.end()
+        elif len(psk.colors):
+            print("Vertex colors skipped: %i colors for %i wedges" % (len(psk.colors), len(wedges)))
+        mesh_obj = bpy.data.objects.new(gen_names['mesh_object'], mesh_data)
+    #===================================================================================================
+    # Mesh Vertex Group bone weight
+    #===================================================================================================
+    if bImportmesh:
+        stats.begin('weights', len(RWghts))
+        #create bone vertex group #deal with bone id for index number
+        vgroups = [mesh_obj.vertex_groups.new(bone_name) for bone_name in skeleton.names]
+        
+        # sort influences by (bone, weight), then add every run of equal
+        # (bone, weight) to vertex group with one call
+        vgps = RWghts[np.lexsort((RWghts['weight'], RWghts['bone_index']))]
+        vgps_bone = vgps['bone_index']
+        vgps_weight = vgps['weight']
+        vgps_points = vgps['point_index'].tolist()
+        
+        run_starts = np.flatnonzero(np.concatenate(([True],
+                                (vgps_bone[1:] != vgps_bone[:-1]) |
+                                (vgps_weight[1:] != vgps_weight[:-1])
+                                )))[:len(vgps)]
+        run_ends = np.append(run_starts[1:], len(vgps))
+        
+        for (run_start, run_end) in zip(run_starts.tolist(), run_ends.tolist()):
+            bone_index = int(vgps_bone[run_start])
+            if not 0 <= bone_index < len(vgroups):
+                continue
+            vgroups[bone_index].add(vgps_points[run_start:run_end], float(vgps_weight[run_start]), 'ADD')
+        stats.end()
+
+    #===================================================================================================
+    # Shape keys (pskx morph targets)
+    #===================================================================================================
+    if bImportmesh and len(psk.morph_infos):
+        morph_counts = psk.morph_infos['num_vertices'].astype(np.int64)
+        morph_deltas = psk.morph_deltas
+        if (morph_counts < 0).any() or morph_counts.sum() != len(morph_deltas):
+            print("Shape keys skipped: %i morph deltas for %i in MRPHINFO" % (len(morph_deltas), morph_counts.sum()))
+        else:
+            stats.begin('shape keys', len(morph_deltas))
+            print("-- Shape keys -- (name, deltas)")
+            mesh_obj.shape_key_add(name = "Basis", from_mix = False)
+            # deltas of morph N: [morph_starts[N], morph_starts[N + 1])
+            morph_starts = np.concatenate(([0], np.cumsum(morph_counts))).tolist()
+            # coordinates of key, base coordinates are restored after every key: numpy work per key
+            # is its deltas, then one foreach_set of whole key (bpy has no sparse bulk setter, access
+            # of shape_key.data[i] is RNA lookup per point)
+            key_co = verts.astype(np.float32)
+            for (counter, morph_name_raw) in enumerate(psk.morph_infos['name'].tolist()):
+                deltas = morph_deltas[morph_starts[counter]:morph_starts[counter + 1]]
+                point_indexes = deltas['point_index']
+                valid = (point_indexes >= 0) & (point_indexes < len(verts))
+                point_indexes = point_indexes[valid]
+                
+                shape_key = mesh_obj.shape_key_add(name = util_bytes_to_str(morph_name_raw), from_mix = False)
+                print("%s %i" % (shape_key.name, len(point_indexes)))
+                key_co[point_indexes] = verts[point_indexes] + deltas['position_delta'][valid]
+                shape_key.data.foreach_set("co", key_co.ravel())
+                key_co[point_indexes] = verts[point_indexes]
+            stats.end()
+
+    if bImportmesh:
+        stats.begin('scene update')
+        mesh_data.update(calc_edges = True)
+
+        # pskx point normals as custom split normals (need edges), normal of every loop from its point
+        if len(psk.normals) == len(verts) and len(faces):
+            stats.begin('normals', faces.size)
+            mesh_data.polygons.foreach_set("use_smooth", np.ones(len(faces), dtype = bool))
+            mesh_data.use_auto_smooth = True
+            mesh_data.normals_split_custom_set(psk.normals['normal'][faces].reshape(-1, 3))
+            stats.end()
+        elif len(psk.normals):
+            print("Normals skipped: %i normals for %i points" % (len(psk.normals), len(verts)))
+        
+        bpy.context.scene.objects.link(mesh_obj)   
+        bpy.context.scene.update()
+        stats.end()
+
+        select_all(False)
+        #mesh_obj.select = True
+        bpy.context.scene.objects.active = mesh_obj
+    
+        if bImportbone:
+            armature_obj.select = True
+            # parenting mesh to armature object
+            mesh_obj.parent = armature_obj
+            mesh_obj.parent_type = 'OBJECT'
+            # add armature modifier
+            blender_modifier = mesh_obj.modifiers.new( armature_obj.data.name, type='ARMATURE')
+            blender_modifier.show_expanded = False
+            blender_modifier.use_vertex_groups = True
+            blender_modifier.use_bone_envelopes = False
+            blender_modifier.object = armature_obj
+        
+    utils_set_mode('OBJECT')
+    util_import_stats_done(stats, filepath, stats_output)
+    return True
+#End of def pskimport#########################
+
+def util_fcurve_set_keys(fcurve, frames, values, interpolation = None):
+    '''fill empty fcurve with keys (frames[i], values[i]) in one go.
+    Keys get default interpolation (or given one, e.g. 'LINEAR')
+    and handles are calculated once, on update().'''
+    co = np.empty((len(frames), 2), dtype = np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    fcurve.keyframe_points.add(len(frames))
+    fcurve.keyframe_points.foreach_set("co", co.ravel())
+    if interpolation is not None:
+        # enum property: foreach_set() takes bool, int and float properties only
+        for keyframe in fcurve.keyframe_points:
+            keyframe.interpolation = interpolation
+    fcurve.update()
+
+class class_psa_bone:
+    name = ""
+    fcurve_loc_x = None
+    fcurve_loc_y = None
+    fcurve_loc_z = None
+    fcurve_quat_x = None
+    fcurve_quat_y = None
+    fcurve_quat_z = None
+    fcurve_quat_w = None
+
+def util_psa_read_files(filepaths):
+    '''(class_psa_reader, None) of every file or (None, error message) if file can not be opened
+    or is not psa (broken). Files are opened in thread pool.'''
+    def read(filepath):
+        try:
+            return (class_psa_reader(filepath), None)
+        except IOError:
+            return (None, 'Error while opening file for reading:\n  "' + filepath + '"')
+        except ValueError as error:
+            return (None, str(error))
+    if len(filepaths) == 1:
+        return [read(filepaths[0])]
+    with concurrent.futures.ThreadPoolExecutor(max_workers = PSA_IMPORT_WORKERS) as executor:
+        return list(executor.map(read, filepaths))
+
+def util_map_ahead(executor, function, items, ahead):
+    '''as executor.map(function, *zip(*items)), but only <ahead> items are submitted
+    before result of first one is taken (results are not kept for all items at once)'''
+    futures = collections.deque()
+    for item in items:
+        futures.append(executor.submit(function, *item))
+        if len(futures) > ahead:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
+
+def util_psa_solve_executor(actions_count, solve_size):
+    '''pool for util_psa_action_keys(): processes if they are forked (linux) and import is big
+    (solve_size: pose bones * frames of all actions >= PSA_PROCESS_POOL_MIN_SIZE),
+    threads otherwise (spawned process can not import addon package without bpy).
+    Forked worker shares memory of Blender copy-on-write, but it is not free: page tables of
+    whole process are copied on fork, and every page written by worker (its arrays, reference
+    counts of python objects it touches) becomes its own copy. Memory of workers grows with
+    size of Blender process and scene, and is held until pool is shut down (end of import).'''
+    if (min(PSA_IMPORT_WORKERS, actions_count) > 1 and solve_size >= PSA_PROCESS_POOL_MIN_SIZE
+            and sys.platform.startswith('linux') and multiprocessing.get_start_method() == 'fork'):
+        return concurrent.futures.ProcessPoolExecutor(max_workers = min(PSA_IMPORT_WORKERS, actions_count))
+    return concurrent.futures.ThreadPoolExecutor(max_workers = PSA_IMPORT_WORKERS)
+
+def psaimport(filepath, context, bFilenameAsPrefix = False, bActionsToTrack = False, action_indexes = None,
+              stats = None, stats_output = 'NONE', bDebugLog = False, reduce_keys_error = 0.0,
+              bKeyTimes = False):
+    '''filepath: path of psa file or list of paths. Files are read at once,
+    armature is set up once for all of them, actions are added file by file.
+    action_indexes: actions to import (None - all). For list of paths: {filepath: action indexes}.
+    stats, stats_output: see pskimport() (stats are written next to first file)
+    bDebugLog: write chunks and raw data to <filepath>.txt
+    reduce_keys_error: > 0 - remove keys, that linear interpolation reproduces within this error
+    (kept keys get linear interpolation)
+    bKeyTimes: place keys at their times (VQuatAnimKey.Time), AnimRate of action mapped to scene fps.
+    False - key of every frame.
+    Returns False if any file is not imported.'''
+    if isinstance(filepath, str):
+        filepaths = [filepath]
+        action_indexes = {filepath: action_indexes}
+    else:
+        filepaths = list(filepath)
+        action_indexes = action_indexes or {}
+    print ("--------------------------------------------------")
+    print ("---------SCRIPT EXECUTING PYTHON IMPORTER---------")
+    print ("--------------------------------------------------")
+    for filepath in filepaths:
+        print ("Importing file: ", filepath)
+    if stats is None:
+        stats = class_import_stats()
+
+    # error of file: shown once for all files
+    errors = []
+    def file_error(filepath, msg):
+        if len(filepaths) > 1:
+            msg = util_gen_name_part(filepath) + ": " + msg.replace("\n", " ")
+        errors.append(msg)
+
+    def close_all():
+        for psa_reader in psa_readers:
+            if psa_reader is not None:
+                psa_reader.close()
+
+    stats.begin('read', len(filepaths))
+    psa_readers = []
+    for (filepath, (psa_reader, read_error)) in zip(filepaths, util_psa_read_files(filepaths)):
+        psa_readers.append(psa_reader)
+        if read_error is not None:
+            file_error(filepath, read_error)
+    stats.end()
+    if all(psa_reader is None for psa_reader in psa_readers):
+        stats.end_all()
+        util_ui_show_msg("\n".join(errors))
+        return False
+
+    armature_obj = None
+
+    opts = context.scene.psk_import
+    if opts.armature_selected:
+        #use selected armature
+        if opts.armature_list:
+            armature_name = opts.armature_list[opts.armature_list_idx].name
+            armature_obj = bpy.data.objects.get(armature_name)
+            if armature_obj is None:
+                util_ui_show_msg("Selected armature not found: "+armature_name)
+                close_all()
+                return False
+    else:
+        #use first armature
+        for obj in bpy.data.objects:
+            if obj.type == 'ARMATURE':
+                armature_obj = obj
+                break
+
+    if armature_obj is None:
+        util_ui_show_msg("No armatures found.\nImport armature from psk file first.")
+        close_all()
+        return False
+
+    utils_set_mode('OBJECT')
+
+    stats.begin('pose', len(armature_obj.pose.bones))
+    #build tmp pose bone tree
+    psa_bones = {}
+    for bone in armature_obj.pose.bones:
+        psa_bone = class_psa_bone()
+        psa_bone.name = bone.name
+        psa_bones[bone.name] = psa_bone
+
+    # pose bones as arrays for util_psa_solve_keys()
+    pose_bones = armature_obj.pose.bones
+    pose_bone_indexes = {pose_bone.name: index for (index, pose_bone) in enumerate(pose_bones)}
+
+    pose_parent_indexes = [-1] * len(pose_bones)
+    for (index, pose_bone) in enumerate(pose_bones):
+        if pose_bone.parent is not None:
+            pose_parent_indexes[index] = pose_bone_indexes[pose_bone.parent.name]
+    # hierarchy order of pose bones
+    pose_skeleton = class_skeleton([pose_bone.name for pose_bone in pose_bones], pose_parent_indexes)
+    # psa bones are mapped to pose bones by name
+    pose_name_index = class_bone_name_index(pose_skeleton.names)
+
+    pose_matrix_rest = np.array([pose_bone.bone.matrix_local for pose_bone in pose_bones])
+    pose_matrix_basis = np.array([pose_bone.matrix_basis for pose_bone in pose_bones])
+    stats.end()
+
+    # (filepath, psa_reader, pose_key_indexes, Action_List) of files to import
+    psa_files = []
+    for (filepath, psa_reader) in zip(filepaths, psa_readers):
+        if psa_reader is None:
+            continue
+        stats.begin('file', len(psa_reader.chunks), filepath)
+
+        # log does nothing if not bDebugLog
+        log = class_debug_log(filepath + ".txt" if bDebugLog else None)
+
+        for chunk in psa_reader.chunks:
+            log.chunk_header(chunk)
+
+        # general header is checked by class_psa_reader
+        missing_chunks = [chunk_name for chunk_name in ('BONENAMES', 'ANIMINFO', 'ANIMKEYS')
+                          if chunk_name not in psa_reader.chunks_by_name]
+        if missing_chunks:
+            file_error(filepath, 'Chunk not found: ' + missing_chunks[0] + '\nSkip import!')
+            log.close()
+            stats.end()
+            continue
+
+        #==============================================================================================
+        # Bones (FNamedBoneBinary)
+        #==============================================================================================
+        stats.begin('bones', len(psa_reader.bones))
+        psa_bone_names = [util_bytes_to_str(name_raw) for name_raw in
+                          psa_reader.bones['name'].tolist()]
+
+        log.write("Name\tFlgs\tNumChld\tPrntIdx\tQx\tQy\tQz\tQw\tLocX\tLocY\tLocZ\tLength\tXSize\tYSize\tZSize\n")
+        log.table(psa_reader.bones['name'], psa_reader.bones['flags'], psa_reader.bones['num_children'],
+                  psa_reader.bones['parent_index'], psa_reader.bones['quat'], psa_reader.bones['pos'],
+                  psa_reader.bones['length'], psa_reader.bones['size'])
+
+        # index of psa bone in keys of every pose bone or -1 (bone without animation)
+        pose_key_indexes = pose_name_index.key_indexes(psa_bone_names)
+        psa_bone_found = np.zeros(len(psa_bone_names), dtype = bool)
+        psa_bone_found[pose_key_indexes[pose_key_indexes >= 0]] = True
+        stats.end()
+
+        for psa_bone_index in np.flatnonzero(~psa_bone_found).tolist():
+            print('Can not find the bone:', psa_bone_names[psa_bone_index])
+
+        if not psa_bone_found.any():
+            file_error(filepath, 'No bone was match!\nSkip import!')
+            log.close()
+            stats.end()
+            continue
+
+        for bone_index in np.flatnonzero(pose_key_indexes < 0).tolist():
+            print('Bone without animation frames:', pose_name_index.names[bone_index])
+
+        #==============================================================================================
+        # Animations (AniminfoBinary)
+        #==============================================================================================
+        Raw_Key_Nums = 0
+        Action_List = [None] * len(psa_reader.actions)
+
+        log.write("Name\tGroup\ttotalbones\tNumRawFrames\n")
+        log.table(psa_reader.actions['name'], psa_reader.actions['group'],
+                  psa_reader.actions['total_bones'], psa_reader.actions['num_raw_frames'])
+
+        for (counter, action_info) in enumerate(psa_reader.actions):
+            Totalbones = int(action_info['total_bones'])
+            NumRawFrames = int(action_info['num_raw_frames'])
+
+            action_name = util_bytes_to_str( action_info['name'] )
+            group_name = util_bytes_to_str( action_info['group'] )
+
+            Raw_Key_Nums += Totalbones * NumRawFrames
+            Action_List[counter] = ( action_name, group_name, Totalbones, NumRawFrames, counter)
+
+        # import only selected actions
+        if action_indexes.get(filepath) is not None:
+            Action_List = [Action_List[action_index] for action_index in action_indexes[filepath]]
+
+        #==============================================================================================
+        # Raw keys (VQuatAnimKey)
+        #==============================================================================================
+        # keys are not read here, see psa_reader.action_keys()
+        chunk_header_datacount = psa_reader.chunks_by_name['ANIMKEYS'][3]
+        log.close()
+        stats.end()
+
+        if(Raw_Key_Nums != chunk_header_datacount):
+            file_error(filepath,
+                    'Raw_Key_Nums Inconsistent.'
+                    '\nData count found: '+str(chunk_header_datacount)+
+                    '\nRaw_Key_Nums:' + str(Raw_Key_Nums)
+                    )
+            continue
+
+        psa_files.append((filepath, psa_reader, pose_key_indexes, Action_List))
+
+    if not psa_files:
+        stats.end_all()
+        util_ui_show_msg("\n".join(errors))
+        close_all()
+        return False
+
+    print('Calculating animation:')
+
+    # unbind meshes, that uses this armature
+    # because scene.update() calculating its positions
+    # but we don't need it - its a big waste of time(CPU)
+
+    armature_modifiers = []
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH':
+            continue
+
+        for modifier in obj.modifiers:
+            if modifier.type != 'ARMATURE':
+                continue
+            if modifier.object == armature_obj:
+                armature_modifiers.append(modifier)
+                modifier.object = None
+
+    armature_children = []
+    #unbind children (same purpose)
+    for child in armature_obj.children:
+        armature_children.append((child, child.parent_type, child.parent_bone))
+        child.parent = None
+
+    # armature is bound again and worker pool is shut down, also if import fails
+    executor = None
+    try:
+        #dev
+        # for pose_bone in armature_obj.pose.bones:
+            # pose_bone.bone.use_inherit_rotation = False
+            # pose_bone.bone.use_inherit_scale = False
+
+        bpy.context.scene.objects.active = armature_obj
+        # armature_obj.hide = True
+        # scene_update()
+
+        ##########################################################
+        mat_pose_rot_fix = Matrix.Rotation(-math.pi/2, 4, 'Z') * Matrix.Rotation(-math.pi/2,4,'Y')
+        mat_pose_rot_fix = np.array(mat_pose_rot_fix)
+        ##########################################################
+
+        counter = 0
+
+        armature_obj.animation_data_create()
+
+
+        if bActionsToTrack:
+            # one track for all files
+            nla_track = armature_obj.animation_data.nla_tracks.new()
+            nla_track.name = util_gen_name_part(psa_files[0][0])
+            nla_stripes = nla_track.strips
+            nla_track_last_frame = 0
+        else:
+            is_first_action = True
+            first_action = None
+
+        scene_fps = context.scene.render.fps / context.scene.render.fps_base
+    
+        def key_frames(psa_reader, raw_action):
+            # frame of every key of action
+            NumRawFrames = raw_action[3]
+            if not bKeyTimes or raw_action[2] == 0:
+                return np.arange(NumRawFrames, dtype = np.float64)
+            action_info = psa_reader.actions[raw_action[4]]
+            anim_rate = float(action_info['anim_rate'])
+            # times of first bone (all bones of frame have same time)
+            return util_psa_key_frames(psa_reader.action_keys(raw_action[4])['time'][:, 0],
+                                       float(action_info['track_time']), float(action_info['key_reduction']),
+                                       scene_fps / anim_rate if anim_rate > 0.0 else 1.0)
+    
+        def solve_args(psa_reader, pose_key_indexes, raw_action):
+            # keys of action (view of mapped file)
+            action_keys = psa_reader.action_keys(raw_action[4])
+
+            # (x, y, z, w) -> (w, x, y, z)
+            return (pose_skeleton, pose_key_indexes,
+                    pose_matrix_rest, pose_matrix_basis, mat_pose_rot_fix,
+                    action_keys['pos'].astype(np.float64),
+                    action_keys['quat'][..., (3, 0, 1, 2)].astype(np.float64))
+
+        # actions are solved in worker processes (arrays in, arrays out), while keys of previous ones are set here
+        # (frame of every key is found once, for solving and for fcurves;
+        # psa bones after TotalBones of action have no keys in it)
+        file_actions = [(filepath, psa_reader, util_psa_action_key_indexes(pose_key_indexes, raw_action[2]),
+                         raw_action, key_frames(psa_reader, raw_action))
+                        for (filepath, psa_reader, pose_key_indexes, Action_List) in psa_files
+                        for raw_action in Action_List]
+        solve_size = sum(raw_action[3] for (filepath, psa_reader, pose_key_indexes, raw_action, frames)
+                         in file_actions) * len(pose_bones)
+        executor = util_psa_solve_executor(len(file_actions), solve_size)
+        solved_actions = util_map_ahead(executor, util_psa_action_keys,
+                                        ((solve_args(psa_reader, pose_key_indexes, raw_action),
+                                          frames, reduce_keys_error)
+                                         for (filepath, psa_reader, pose_key_indexes, raw_action, frames)
+                                         in file_actions),
+                                        2 * PSA_IMPORT_WORKERS)
+        # keys of keyed bones: (all, written)
+        keys_total = 0
+        keys_written = 0
+
+        stats.begin('keyframes', len(file_actions))
+        for (filepath, psa_reader, pose_key_indexes, raw_action, frames) in file_actions:
+            Name = raw_action[0]
+            Group = raw_action[1]
+
+            if Group != 'None':
+                Name = "(%s) %s" % (Group,Name)
+            if bFilenameAsPrefix:
+                Name = "(%s) %s" % (util_gen_name_part(filepath), Name)
+            Totalbones = raw_action[2]
+            NumRawFrames = raw_action[3]
+            action = bpy.data.actions.new(name = Name)
+
+            stats.begin('action', NumRawFrames, Name)
+            # force print usefull information to console(due to possible long execution)
+            counter += 1
+            print("Action {0:>3d}/{1:<3d} frames: {2:>4d} {3}".format(
+                    counter, len(file_actions), NumRawFrames, Name)
+                  )
+
+            #create all fcurves(for all bones) for frame
+            # bones which get fcurves
+            pose_keyed_indexes = np.flatnonzero(pose_key_indexes >= 0).tolist()
+            pose_keyed_count = len(pose_keyed_indexes)
+            stats.begin('fcurves', 7 * pose_keyed_count)
+            for bone_index in pose_keyed_indexes:
+                pose_bone = pose_bones[bone_index]
+                psa_bone = psa_bones[pose_bone.name]
+
+                data_path = pose_bone.path_from_id("rotation_quaternion")
+                psa_bone.fcurve_quat_w = action.fcurves.new(data_path, index=0)
+                psa_bone.fcurve_quat_x = action.fcurves.new(data_path, index=1)
+                psa_bone.fcurve_quat_y = action.fcurves.new(data_path, index=2)
+                psa_bone.fcurve_quat_z = action.fcurves.new(data_path, index=3)
+
+                data_path = pose_bone.path_from_id("location")
+                psa_bone.fcurve_loc_x = action.fcurves.new(data_path, index=0)
+                psa_bone.fcurve_loc_y = action.fcurves.new(data_path, index=1)
+                psa_bone.fcurve_loc_z = action.fcurves.new(data_path, index=2)
+            stats.end()
+
+            # wait for solved action
+            stats.begin('solve', Totalbones * NumRawFrames)
+            (locations, quaternions, keep) = next(solved_actions)
+            stats.end()
+
+            stats.begin('keys')
+            action_keys_written = 0
+            for bone_index in pose_keyed_indexes:
+                pbone = psa_bones[pose_bones[bone_index].name]
+
+                # quaternions are continuous already (see util_quat_continuity)
+                loc = locations[:, bone_index]
+                quat = quaternions[:, bone_index]
+            
+                fcurves = (pbone.fcurve_quat_w, pbone.fcurve_quat_x, pbone.fcurve_quat_y, pbone.fcurve_quat_z,
+                           pbone.fcurve_loc_x, pbone.fcurve_loc_y, pbone.fcurve_loc_z)
+                values = (quat[:, 0], quat[:, 1], quat[:, 2], quat[:, 3],
+                          loc[:, 0], loc[:, 1], loc[:, 2])
+                for (curve_index, fcurve) in enumerate(fcurves):
+                    if keep is None:
+                        util_fcurve_set_keys(fcurve, frames, values[curve_index])
+                        action_keys_written += NumRawFrames
+                    else:
+                        curve_keep = keep[:, bone_index, curve_index]
+                        util_fcurve_set_keys(fcurve, frames[curve_keep], values[curve_index][curve_keep], 'LINEAR')
+                        action_keys_written += int(np.count_nonzero(curve_keep))
+            keys_total += 7 * NumRawFrames * pose_keyed_count
+            keys_written += action_keys_written
+            stats.end(action_keys_written)
+
+            if bActionsToTrack:
+                if nla_track_last_frame == 0:
+                    nla_stripes.new(Name, 0, action)
+                else:
+                    nla_stripes.new(Name, nla_stripes[-1].frame_end, action)
+                nla_track_last_frame += NumRawFrames
+            elif is_first_action:
+                first_action = action
+                is_first_action = False
+            stats.end()
+
+            #break on first animation set
+            # break
+        stats.end()
+    
+        if reduce_keys_error > 0.0 and keys_total:
+            print("Key reduction: removed {0} of {1} keys ({2:.1f}%), ~{3:.1f} MB".format(
+                    keys_total - keys_written, keys_total,
+                    100.0 * (keys_total - keys_written) / keys_total,
+                    (keys_total - keys_written) * KEY_BYTES / (1024.0 * 1024.0)))
+
+        # set to rest position or set to first imported action
+        if not bActionsToTrack:
+            # for pose_bone in armature_obj.pose.bones:
+                # pose_bone.rotation_quaternion = (1,0,0,0)
+                # pose_bone.location = (0,0,0)
+            if not bpy.context.scene.is_nla_tweakmode:
+                armature_obj.animation_data.action = first_action
+        stats.begin('scene update')
+        context.scene.frame_set(0)
+        ##scene_update()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+        # bind meshes again (setup modifier)
+        for modifier in armature_modifiers:
+            modifier.object = armature_obj
+
+        # add children
+        for child in armature_children:
+            (obj, p_type, p_bone) = child
+            obj.parent = armature_obj
+            obj.parent_type = p_type
+            obj.parent_bone = p_bone
+
+        close_all()
+    stats.end()
+
+    select_all(False)
+    armature_obj.select = True
+    bpy.context.scene.objects.active = armature_obj
+
+    if errors:
+        util_ui_show_msg("\n".join(errors))
+    util_import_stats_done(stats, filepaths[0], stats_output)
+    print('Done.')
+    return not errors
+
+ 
+class MessageOperator(bpy.types.Operator):
+    bl_idname = "error.message_popup"
+    bl_label = ""
+
+    message = StringProperty(default='Message')
+    lines = []
+    def execute(self, context):
+        self.lines = self.message.split("\n")
+        maxlen = 0
+        for line in self.lines:
+            if len(line) > maxlen:
+                maxlen = len(line)
+            print(line)
+        # self.lines.append("")
+        wm = context.window_manager
+        return wm.invoke_popup(self, width=30 + 6*maxlen, height=400)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label("[PSA/PSK Importer]", icon='ANIM')
+
+        for line in self.lines:
+            # row = self.layout.row(align=True)
+            # row.alignment = 'LEFT'
+            layout.label(line)
+
+def getInputFilenamepsk(self, filename, bImportmesh, bImportbone, bDebugLogPSK, bImportsingleuv,
+                        stats_output = 'NONE', cache = None):
+    return pskimport(         filename, bImportmesh, bImportbone, bDebugLogPSK, bImportsingleuv,
+                              stats_output = stats_output, cache = cache)
+
+def getInputFilenamepsa(self, filename, context, _bFilenameAsPrefix, _bActionsToTrack, _action_indexes = None,
+                        _reduce_keys_error = 0.0, _bKeyTimes = False):
+    return psaimport(         filename, context, bFilenameAsPrefix=_bFilenameAsPrefix, bActionsToTrack=_bActionsToTrack,
+                              action_indexes=_action_indexes,
+                              reduce_keys_error=_reduce_keys_error,
+                              bKeyTimes=_bKeyTimes,
+                              stats_output=context.scene.psk_import.stats_output,
+                              bDebugLog=context.scene.psk_import.debug_log)
+    
+class UDKImportArmaturePG(bpy.types.PropertyGroup):
+    string = StringProperty()
+    bones = StringProperty()
+    have_animation = BoolProperty(default=False)
+ 
+class PsaImportActionPG(bpy.types.PropertyGroup):
+    group = StringProperty()
+    frames = IntProperty()
+    bones = IntProperty()
+    action_index = IntProperty()
+    use_import = BoolProperty(default=False)
+ 
+#properties for panels, and Operator.
+class PskImportSharedOptions():
+    bl_options = {}
+    debug_log = BoolProperty(
+            name="Debug log",
+            description="Write debug information and raw data to <filename>.txt (for test purposes)",
+            default=False,
+            )
+    bonesize = FloatProperty(
+            name="Bone length",
+            description="Constant length for all bones. From head to tail distance",
+            default=0.5, min=0.01, max=10, step=0.1, precision=2,
+            )
+    single_uvtexture = BoolProperty(
+            name="Single UV texture",
+            description="If checked, MatIndex from vertex UV data will be ignored.",
+            default=True,
+            )
+    stats_output = EnumProperty(
+            name="Import stats",
+            description="Write time, peak memory and item counts of import phases next to imported file",
+            items=(('NONE','None','Do not write import stats'),
+                    ('JSON','JSON','Write <filename>.stats.json'),
+                    ('TRACE','Trace','Write <filename>.trace.json (chrome://tracing, Perfetto)')),
+            default='NONE',
+            )
+    use_cache = BoolProperty(
+            name="Parse cache",
+            description="Keep decoded chunks of imported psk files in cache directory "
+                        "(uncompressed, read without decoding). Next import of same file does not parse it",
+            default=False,
+            )
+    cache_dir = StringProperty(
+            name="Cache directory",
+            description="Directory of parse cache. Empty: user cache directory",
+            subtype='DIR_PATH',
+            default="",
+            )
+    cache_size = IntProperty(
+            name="Cache size (MB)",
+            description="Least recently used files are removed from cache over this size",
+            default=1024, min=16,
+            )
+    import_mode = EnumProperty(
+            name="Import mode.",
+            items=(('All','All','Import mesh and skeleton'),
+                    ('Mesh','Mesh','Import only mesh'),
+                    ('Skel','Skel','Import only skeleton'))
+            )
+   
+class PskImportOptions(bpy.types.PropertyGroup, PskImportSharedOptions):
+    armature_list = CollectionProperty(type=UDKImportArmaturePG)
+    armature_list_idx = IntProperty()
+    armature_selected = BoolProperty(
+        name = "Armature Selected",
+        description = "Choose Armature to Import psa animation data",
+        default = False)
+
+class IMPORT_OT_psk(bpy.types.Operator, PskImportSharedOptions):
+    """Import skeleton and/or mesh."""
+    bl_idname = "import_scene.psk"
+    bl_label = "Import PSK"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_options = {'UNDO'}
+
+    filepath = StringProperty(
+            subtype='FILE_PATH',
+            )
+    filter_glob = StringProperty(
+            default="*.psk;*.pskx",
+            options={'HIDDEN'},
+            )
+            
+    def draw(self, context):
+        opts = bpy.context.scene.psk_import
+        layout = self.layout
+        #layout.label("PSK Import", icon='ANIM')
+
+        layout.prop(opts, 'import_mode', expand=True)
+        sub = layout.row()
+        sub.active = opts.import_mode != 'Skel'
+        sub.prop(opts, 'single_uvtexture')
+        sub = layout.row()
+        sub.active = opts.import_mode != 'Mesh'
+        sub.prop(opts, 'bonesize')
+        layout.prop(opts, 'debug_log')
+        layout.prop(opts, 'stats_output')
+        layout.prop(opts, 'use_cache')
+        if opts.use_cache:
+            layout.prop(opts, 'cache_dir')
+            layout.prop(opts, 'cache_size')
+        
+
+    def execute(self, context):
+        opts = bpy.context.scene.psk_import
+        bImportbone = False
+        bImportmesh = False
+        if opts.import_mode == 'Mesh':
+            bImportmesh = True
+        elif opts.import_mode == 'Skel':
+            bImportbone = True
+        else:
+            bImportbone = True
+            bImportmesh = True
+        
+        no_errors = getInputFilenamepsk(self, 
+                        self.filepath,
+                        bImportmesh, bImportbone, opts.debug_log,
+                        opts.single_uvtexture,
+                        opts.stats_output,
+                        util_parse_cache(opts)
+                        )
+        if not no_errors:
+            return {'CANCELLED'}
+        else:
+            return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        wm = context.window_manager
+        wm.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class IMPORT_OT_psa(bpy.types.Operator):
+    '''Load a skeleton anim psa File'''
+    bl_idname = "import_scene.psa"
+    bl_label = "Import PSA"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+
+    filepath = StringProperty(
+            subtype='FILE_PATH',
+            )
+    # selected files (several files are imported at once)
+    files = CollectionProperty(
+            type=bpy.types.OperatorFileListElement,
+            options={'HIDDEN', 'SKIP_SAVE'},
+            )
+    directory = StringProperty(
+            subtype='DIR_PATH',
+            options={'HIDDEN', 'SKIP_SAVE'},
+            )
+    filter_glob = StringProperty(
+            default="*.psa",
+            options={'HIDDEN'},
+            )
+    bFilenameAsPrefix = BoolProperty(
+            name="Prefix action names",
+            description="Use filename as prefix for action names.",
+            default=False,
+            )
+    bActionsToTrack = BoolProperty(
+            name="All actions to NLA track",
+            description="Add all imported action to new NLAtrack. One by one.",
+            default=False,
+            )
+    bKeyTimes = BoolProperty(
+            name="Key times and rate",
+            description="Place keys at their times, rate of action is mapped to scene fps "
+                        "(keys can be at fractional frames, e.g. 30 fps action in 24 fps scene). "
+                        "Uncheck: key on every frame",
+            default=False,
+            )
+    bReduceKeys = BoolProperty(
+            name="Reduce keys",
+            description="Remove keys, that linear interpolation of other keys reproduces within max error. "
+                        "Keys get linear interpolation",
+            default=False,
+            )
+    reduce_keys_error = FloatProperty(
+            name="Max error",
+            description="Max difference of location / quaternion component from original keys",
+            default=0.001, min=0.0, max=1.0, step=0.01, precision=5,
+            )
+    bImportAllActions = BoolProperty(
+            name="All actions",
+            description="Import all actions. Uncheck to choose actions from list "
+                        "(list is of active file, other selected files are imported with all actions).",
+            default=True,
+            )
+    actions = CollectionProperty(type=PsaImportActionPG)
+    actions_idx = IntProperty()
+    # file of actions list (list is filled on file select, from ANIMINFO only)
+    actions_filepath = StringProperty(options={'HIDDEN', 'SKIP_SAVE'})
+    
+    def scan_actions(self):
+        self.actions_filepath = self.filepath
+        while self.actions:
+            self.actions.remove(0)
+            
+        actions_info = util_psa_scan_actions(self.filepath)
+        if actions_info is None:
+            return
+        for (action_index, (name, group, frames, bones)) in enumerate(actions_info):
+            item = self.actions.add()
+            item.name = name
+            item.group = group
+            item.frames = frames
+            item.bones = bones
+            item.action_index = action_index
+    
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'bFilenameAsPrefix')
+        layout.prop(self, 'bActionsToTrack')
+        layout.prop(self, 'bKeyTimes')
+        layout.prop(self, 'bReduceKeys')
+        sub = layout.row()
+        sub.active = self.bReduceKeys
+        sub.prop(self, 'reduce_keys_error')
+        layout.prop(context.scene.psk_import, 'debug_log')
+        layout.prop(context.scene.psk_import, 'stats_output')
+        
+        if self.actions_filepath != self.filepath:
+            self.scan_actions()
+            
+        layout.prop(self, 'bImportAllActions')
+        if self.actions:
+            sub = layout.column()
+            sub.active = not self.bImportAllActions
+            sub.template_list("IMPORT_UL_psa_actions", "", self, "actions",
+                                 self, "actions_idx", rows=8)
+        else:
+            layout.label("No actions found.")
+    
+    def execute(self, context):
+        filepath = os.path.normpath(self.filepath)
+        filepaths = [os.path.normpath(os.path.join(self.directory, file_elem.name))
+                     for file_elem in self.files if file_elem.name]
+        if self.filepath and filepath not in filepaths:
+            filepaths.append(filepath)
+        action_indexes = {}
+        if not self.bImportAllActions:
+            if self.actions_filepath != self.filepath:
+                self.scan_actions()
+            action_indexes[filepath] = [item.action_index for item in self.actions if item.use_import]
+            if not action_indexes[filepath]:
+                util_ui_show_msg("No actions selected.\nCheck actions for import.")
+                return {'CANCELLED'}
+        getInputFilenamepsa(self, filepaths, context, self.bFilenameAsPrefix, self.bActionsToTrack,
+                            action_indexes, self.reduce_keys_error if self.bReduceKeys else 0.0,
+                            self.bKeyTimes)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        wm.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+        
+class Panel_UDKImport(bpy.types.Panel):
+    bl_label = "PSK/PSA Import"
+    bl_idname = "OBJECT_PT_udk_import"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "TOOLS"
+    #bl_options = {'HIDE_HEADER'}
+    # filepath = StringProperty(
+            # subtype='FILE_PATH',
+            # )
+            
+    # @classmethod
+    # def poll(cls, context):
+        # return context.scene.get('psk_import') is not None
+ 
+    def draw(self, context):
+        opts = bpy.context.scene.psk_import
+        layout = self.layout
+       
+        layout.label("Mesh and skeleton:")
+        layout.operator(IMPORT_OT_psk.bl_idname, icon='MESH_DATA')
+        layout.prop(opts, 'import_mode',expand=True)
+        
+        layout.separator()
+        layout.label("Animation:")
+        layout.operator(IMPORT_OT_psa.bl_idname, icon='ANIM')
+        
+        if opts.armature_selected:
+            split = layout.split(.75)
+            split.prop(opts, "armature_selected")
+            split.operator(OBJECT_OT_UDKImportArmature.bl_idname, text="", icon='FILE_REFRESH')
+            layout.template_list("OBJECT_UL_armatures", "", opts, "armature_list",
+                                 opts, "armature_list_idx", rows=5)
+        else:
+            layout.prop(opts, "armature_selected")
+        
+class OBJECT_UL_armatures(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        split = layout.split(0.75)
+        if item.have_animation:
+            split.label(str(item.name),icon='ANIM')
+        else:
+            split.label("     "+str(item.name))
+        #split.prop(item, "bones", text="", emboss=False, translate=False, icon='BONE_DATA')
+        split.label(str(item.bones),icon='BONE_DATA')
+
+        
+class IMPORT_UL_psa_actions(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        split = layout.split(0.6)
+        row = split.row(align=True)
+        row.prop(item, "use_import", text="")
+        if item.group != 'None':
+            row.label("(%s) %s" % (item.group, item.name))
+        else:
+            row.label(item.name)
+        split.label(str(item.frames), icon='TIME')
+        split.label(str(item.bones), icon='BONE_DATA')
+
+        
+class OBJECT_OT_PSAPath(bpy.types.Operator):
+    """Select .psa file path to import for animation data"""
+    bl_idname = "object.psapath"
+    bl_label = "Import PSA Path"
+
+    filepath = StringProperty(
+            name="PSA File Path",
+            description="Filepath used for importing the PSA file",
+            maxlen=1024,
+            default=""
+            )
+    filter_glob = StringProperty(
+            default="*.psa",
+            options={'HIDDEN'},
+            )
+    bFilenameAsPrefix = BoolProperty(
+            name="Prefix action names",
+            description="Use filename as prefix for action names.",
+            default=False
+            )
+    def execute(self, context):
+        getInputFilenamepsa(self,self.filepath,context)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        bpy.context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class OBJECT_OT_UDKImportArmature(bpy.types.Operator):
+    """Update armature list"""
+    bl_idname = "object.udkimportarmature"
+    bl_label = "" #not visible in "<space>"
+    def execute(self, context):
+        my_objlist = bpy.context.scene.psk_import.armature_list
+        objectl = []
+        
+        #clear list
+        for _obj in my_objlist:
+            my_objlist.remove(0)
+            
+        #fill list
+        for obj in bpy.context.scene.objects:
+            if obj.type == 'ARMATURE':
+                list_item = my_objlist.add()
+                list_item.name = obj.name
+                list_item.bones = str(len(obj.data.bones))
+                
+                # if obj have assigned action or any NLA tracks, mark it
+                if obj.animation_data\
+                        and (obj.animation_data.action 
+                             or obj.animation_data.nla_tracks):
+                    list_item.have_animation = True
+                else:
+                    list_item.have_animation = False
+                
+        return{'FINISHED'}
+    
+def menu_func(self, context):
+    self.layout.operator(IMPORT_OT_psk.bl_idname, text="Skeleton Mesh (.psk)")
+    self.layout.operator(IMPORT_OT_psa.bl_idname, text="Skeleton Anim (.psa)")
+    
+def register():
+    bpy.utils.register_module(__name__)
+    bpy.types.INFO_MT_file_import.append(menu_func)
+    bpy.types.Scene.psk_import = PointerProperty(type=PskImportOptions)
+
+
+def unregister():
+    bpy.utils.unregister_module(__name__)
+    bpy.types.INFO_MT_file_import.remove(menu_func)
+    del bpy.types.Scene.psk_import
@@ -0,0 +1,123 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Solved action keys, prepared for fcurves (no bpy here).
+
+Keys are placed at their times (VQuatAnimKey.Time, AnimInfoBinary.AnimRate).
+Quaternions are made continuous for the whole action at once.
+Optional key reduction removes keys, that linear interpolation of kept keys
+reproduces within given error (Ramer-Douglas-Peucker, all curves at once).
+'''
+
+import numpy as np
+
+from .skeleton import util_psa_solve_keys
+
+# sizeof(BezTriple): memory of one fcurve key in Blender
+KEY_BYTES = 72
+
+def util_quat_continuity(quats):
+    '''flip quaternions (frames, ..., 4) to hemisphere of previous frame (q and -q are same rotation),
+    so interpolation between keys takes short path. In place, returns quats.'''
+    if len(quats) < 2:
+        return quats
+    dots = np.sum(quats[1:] * quats[:-1], axis = -1)
+    # sign of frame is product of flips of all frames before it
+    signs = np.cumprod(np.where(dots < 0.0, -1.0, 1.0), axis = 0)
+    quats[1:] *= signs[..., np.newaxis]
+    return quats
+
+def util_psa_key_frames(key_times, track_time = 0.0, key_reduction = 1.0, frame_scale = 1.0):
+    '''frame of every key of action.
+    key_times - VQuatAnimKey.Time of keys (duration until next key, in frames of action).
+    Keys are evenly placed over TrackTime (or by KeyReduction ratio) if times are not valid.
+    frame_scale - scene frames per action frame (scene fps / AnimRate)'''
+    count = len(key_times)
+    if count == 0:
+        return np.zeros(0)
+    # time of last key is not used (wraps to first key)
+    durations = np.asarray(key_times[:-1], dtype = np.float64)
+    if not (np.isfinite(durations).all() and (durations > 0.0).all()):
+        if track_time > 0.0:
+            duration = track_time / count
+        elif 0.0 < key_reduction < 1.0:
+            duration = 1.0 / key_reduction
+        else:
+            duration = 1.0
+        durations = np.full(count - 1, duration)
+    return np.concatenate(([0.0], np.cumsum(durations))) * frame_scale
+
+def util_keys_reduce(values, max_error, key_frames = None):
+    '''(curves, keys) -> mask of keys to keep.
+    Removed keys are within max_error of linear interpolation between kept keys.
+    key_frames - frame of every key (default: key index). First and last keys are kept.'''
+    (curves, keys_count) = values.shape
+    keep = np.zeros(values.shape, dtype = bool)
+    if keys_count == 0:
+        return keep
+    if key_frames is None:
+        key_frames = np.arange(keys_count, dtype = np.float64)
+    else:
+        key_frames = np.asarray(key_frames, dtype = np.float64)
+    
+    keep[:, 0] = True
+    keep[:, -1] = True
+    # key too far from line between its neighbours is kept anyway (less iterations on noisy curves)
+    span = key_frames[2:] - key_frames[:-2]
+    t = (key_frames[1:-1] - key_frames[:-2]) / np.where(span > 0.0, span, 1.0)
+    keep[:, 1:-1] = np.abs(values[:, :-2] + (values[:, 2:] - values[:, :-2]) * t - values[:, 1:-1]) > max_error
+    
+    index = np.broadcast_to(np.arange(keys_count), values.shape)
+    rows = np.arange(curves)[:, np.newaxis]
+    while True:
+        # kept keys before and after every key
+        index_prev = np.maximum.accumulate(np.where(keep, index, 0), axis = 1)
+        index_next = np.minimum.accumulate(np.where(keep, index, keys_count - 1)[:, ::-1], axis = 1)[:, ::-1]
+        span = key_frames[index_next] - key_frames[index_prev]
+        t = (key_frames[index] - key_frames[index_prev]) / np.where(span > 0.0, span, 1.0)
+        (values_prev, values_next) = (values[rows, index_prev], values[rows, index_next])
+        error = np.abs(values_prev + (values_next - values_prev) * t - values).ravel()
+        
+        # key of max error of every segment (from kept key to next one) is kept
+        keep_flat = keep.ravel()
+        segment_max = np.maximum.reduceat(error, np.flatnonzero(keep_flat))
+        segment_index = np.cumsum(keep_flat) - 1
+        add = (error > max_error) & (error == segment_max[segment_index])
+        if not add.any():
+            return keep
+        keep |= add.reshape(keep.shape)
+
+def util_psa_action_keys(solve_args, key_frames, max_error = 0.0):
+    '''util_psa_solve_keys(*solve_args) with continuous quaternions, for fcurves.
+    key_frames - frame of every key (see util_psa_key_frames()).
+    max_error > 0: keys of keyed bones are reduced.
+    Returns (locations, quaternions, keep), keep is (keys, bones, 7) mask of
+    (quat w, x, y, z, loc x, y, z) keys or None (all keys).'''
+    (locations, quaternions) = util_psa_solve_keys(*solve_args)
+    util_quat_continuity(quaternions)
+    if max_error <= 0.0:
+        return (locations, quaternions, None)
+    
+    keyed = np.asarray(solve_args[1]) >= 0
+    values = np.concatenate((quaternions, locations), axis = 2)
+    (keys_count, bones) = values.shape[:2]
+    keep = np.ones((keys_count, bones, 7), dtype = bool)
+    keyed_values = values[:, keyed].reshape(keys_count, -1).T
+    keep[:, keyed] = util_keys_reduce(keyed_values, max_error, key_frames).T.reshape(keys_count, -1, 7)
+    return (locations, quaternions, keep)
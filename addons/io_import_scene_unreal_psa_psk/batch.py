@@ -0,0 +1,219 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Batch import (command line)
+
+  blender -b --python io_import_scene_unreal_psa_psk/batch.py -- <dir> [options]
+
+psk/psa files under <dir> are found by file header and grouped to assets.
+Every group is imported by separate background blender process and saved to .blend:
+  psk files first, then psa files to armature of group.
+'''
+
+import bpy
+import os
+import sys
+import time
+import json
+import argparse
+import subprocess
+import concurrent.futures
+
+if __name__ == "__main__" and not __package__:
+    # started as script (--python): import addon package
+    import importlib
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+    importlib.import_module(__package__)
+
+from . import (pskimport,
+               psaimport,
+               utils_set_mode,
+               register)
+from .pskpsa import util_file_type
+from .cache import class_parse_cache
+
+BATCH_RESULT_PREFIX = 'PSKPSA_BATCH_RESULT '
+
+def batch_find_files(root):
+    '''[(filepath, 'psk'|'psa'), ...] of all files under root'''
+    found = []
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            filepath = os.path.join(dirpath, filename)
+            ftype = util_file_type(filepath)
+            if ftype is not None:
+                found.append((filepath, ftype))
+    return found
+
+def batch_group_files(root, found, group_by):
+    '''{group name: [filepath, ...]}, psk files first in every group.
+    group_by 'asset': files with same path without extension, 'dir': files of same directory'''
+    groups = {}
+    for (filepath, ftype) in found:
+        relpath = os.path.relpath(filepath, root)
+        if group_by == 'dir':
+            group_name = os.path.dirname(relpath) or os.path.basename(os.path.abspath(root))
+        else:
+            group_name = os.path.splitext(relpath)[0]
+        groups.setdefault(group_name, []).append((ftype != 'psk', filepath))
+    return {group_name: [filepath for (is_psa, filepath) in sorted(files)]
+            for (group_name, files) in groups.items()}
+
+def batch_clear_scene():
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        scene.objects.unlink(obj)
+        bpy.data.objects.remove(obj)
+
+def batch_import_group(blend_path, filepaths, import_mode, bonesize, cache = None):
+    '''import files to empty scene and save it. Runs in worker process.'''
+    opts = bpy.context.scene.psk_import
+    opts.bonesize = bonesize
+    bImportmesh = import_mode != 'Skel'
+    bImportbone = import_mode != 'Mesh'
+    
+    batch_clear_scene()
+    
+    # actions of different files can have same names
+    bFilenameAsPrefix = sum(1 for filepath in filepaths if util_file_type(filepath) == 'psa') > 1
+    
+    result = {'blend': blend_path, 'files': filepaths, 'failed': []}
+    for filepath in filepaths:
+        try:
+            if util_file_type(filepath) == 'psk':
+                no_errors = pskimport(filepath, bImportmesh, bImportbone, False, opts.single_uvtexture,
+                                      cache = cache)
+            else:
+                no_errors = psaimport(filepath, bpy.context, bFilenameAsPrefix = bFilenameAsPrefix)
+        except Exception as e:
+            no_errors = False
+            print("Exception:", repr(e))
+        if not no_errors:
+            result['failed'].append(filepath)
+            
+    if len(result['failed']) < len(filepaths):
+        utils_set_mode('OBJECT')
+        os.makedirs(os.path.dirname(blend_path), exist_ok = True)
+        bpy.ops.wm.save_as_mainfile(filepath = blend_path, check_existing = False)
+    
+    print(BATCH_RESULT_PREFIX + json.dumps(result))
+    return not result['failed']
+
+def batch_run_worker(args, blend_path, filepaths):
+    '''run blender process for one group. Returns (result, seconds, log)'''
+    cmd = [bpy.app.binary_path, '-b', '--factory-startup', '--python', os.path.abspath(__file__), '--',
+           '--worker', blend_path,
+           '--import-mode', args.import_mode,
+           '--bonesize', str(args.bonesize)]
+    if args.cache:
+        cmd += ['--cache', args.cache, '--cache-size', str(args.cache_size)]
+    cmd += filepaths
+    time_start = time.time()
+    process = subprocess.Popen(cmd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    log = process.communicate()[0].decode(errors = 'replace')
+    seconds = time.time() - time_start
+    
+    result = None
+    for line in log.splitlines():
+        if line.startswith(BATCH_RESULT_PREFIX):
+            result = json.loads(line[len(BATCH_RESULT_PREFIX):])
+    if result is None:
+        # blender crashed or script failed before import
+        result = {'blend': blend_path, 'files': filepaths, 'failed': filepaths}
+    return (result, seconds, log)
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog = 'blender -b --python batch.py --',
+        description = 'Import psk/psa files of directory to .blend files.')
+    parser.add_argument('directory', nargs = '?',
+                        help = 'directory to search psk/psa files (by header, not by extension)')
+    parser.add_argument('-o', '--output', help = 'directory for .blend files (default: same as input)')
+    parser.add_argument('-j', '--jobs', type = int, default = os.cpu_count() or 1,
+                        help = 'blender processes to run at once')
+    parser.add_argument('--group', choices = ('asset', 'dir'), default = 'asset',
+                        help = 'one .blend per asset (files with same name) or per directory')
+    parser.add_argument('--import-mode', choices = ('All', 'Mesh', 'Skel'), default = 'All')
+    parser.add_argument('--bonesize', type = float, default = 0.5)
+    parser.add_argument('--cache', metavar = 'DIR', help = 'parse cache directory (decoded chunks of psk files)')
+    parser.add_argument('--cache-size', type = int, default = 1024, metavar = 'MB',
+                        help = 'parse cache size limit')
+    parser.add_argument('--worker', metavar = 'BLEND', help = argparse.SUPPRESS)
+    parser.add_argument('files', nargs = '*', help = argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.worker:
+        files = ([args.directory] if args.directory else []) + args.files
+        cache = None
+        if args.cache:
+            cache = class_parse_cache(args.cache, args.cache_size * 1024 * 1024)
+        no_errors = batch_import_group(args.worker, files, args.import_mode, args.bonesize, cache)
+        sys.exit(0 if no_errors else 1)
+    
+    if args.directory is None or not os.path.isdir(args.directory):
+        parser.error('directory is required')
+    directory = os.path.abspath(args.directory)
+    output = os.path.abspath(args.output or args.directory)
+    
+    time_start = time.time()
+    found = batch_find_files(directory)
+    groups = batch_group_files(directory, found, args.group)
+    print("Found %i files (psk: %i, psa: %i), %i groups. Jobs: %i" % (
+        len(found),
+        sum(1 for (filepath, ftype) in found if ftype == 'psk'),
+        sum(1 for (filepath, ftype) in found if ftype == 'psa'),
+        len(groups), args.jobs))
+    
+    failed = []
+    done = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(1, args.jobs)) as executor:
+        futures = [executor.submit(batch_run_worker, args,
+                                   os.path.join(output, group_name + '.blend'), filepaths)
+                   for (group_name, filepaths) in sorted(groups.items())]
+        for future in concurrent.futures.as_completed(futures):
+            (result, seconds, log) = future.result()
+            done += 1
+            status = 'FAILED' if result['failed'] else 'ok'
+            print("[{0:>4d}/{1:<4d}] {2:>6.1f}s {3} {4}".format(
+                done, len(futures), seconds, status, result['blend']))
+            if result['failed']:
+                failed.extend(result['failed'])
+                # keep output of worker for failed group
+                log_path = os.path.splitext(result['blend'])[0] + '.log'
+                os.makedirs(os.path.dirname(log_path), exist_ok = True)
+                with open(log_path, 'w') as log_file:
+                    log_file.write(log)
+    
+    seconds = time.time() - time_start
+    size_mb = sum(os.path.getsize(filepath) for (filepath, ftype) in found) / (1024 * 1024)
+    print("--------------------------------------------------")
+    print("Files: %i, failed: %i" % (len(found), len(failed)))
+    print("Time: %.1fs, %.2f files/s, %.2f MB/s" % (
+        seconds, len(found) / max(seconds, 1e-6), size_mb / max(seconds, 1e-6)))
+    for filepath in failed:
+        print("Failed:", filepath)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    # addon can be enabled already
+    if not hasattr(bpy.types.Scene, 'psk_import'):
+        register()
+    batch_main(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else [])
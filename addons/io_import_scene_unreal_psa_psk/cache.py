@@ -0,0 +1,290 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Parse cache (no bpy here).
+
+Decoded chunk arrays of psk file are stored as uncompressed .npy files in entry directory
+of cache directory, named by content hash of file. Arrays are memory mapped on load
+(nothing is decoded or read before use). Hash of file is found by (path, size, mtime) in index,
+so unchanged file is not read at all on warm import.
+Least recently used entries are removed when total size is over limit.
+'''
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import collections.abc
+
+import numpy as np
+
+# changed when stored arrays change (entries of other versions are not used)
+PARSE_CACHE_VERSION = b'pskpsa-cache-6'
+PARSE_CACHE_INDEX = 'index.json'
+# entry directory, <name>.npy file of every array in it
+PARSE_CACHE_EXT = '.entry'
+PARSE_CACHE_ARRAY_EXT = '.npy'
+# entries of older versions (.npz files), removed by evict() and clear()
+PARSE_CACHE_OLD_EXTS = ('.npz',)
+
+def util_cache_default_dir():
+    '''$PSKPSA_CACHE_DIR or cache directory of user'''
+    cache_dir = os.environ.get('PSKPSA_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    if sys.platform == 'win32':
+        base_dir = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+    elif sys.platform == 'darwin':
+        base_dir = os.path.expanduser('~/Library/Caches')
+    else:
+        base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base_dir, 'pskpsa')
+
+def util_npy_check(path):
+    '''bytes of array data in .npy file. Raises ValueError if file is broken (header, size)
+    or is not plain array.'''
+    with open(path, 'rb') as npy_file:
+        try:
+            version = np.lib.format.read_magic(npy_file)
+            if version == (1, 0):
+                (shape, fortran_order, dtype) = np.lib.format.read_array_header_1_0(npy_file)
+            else:
+                (shape, fortran_order, dtype) = np.lib.format.read_array_header_2_0(npy_file)
+        except IOError:
+            raise
+        except Exception as error:
+            # header is parsed as python literal: broken header can raise other errors than ValueError
+            raise ValueError("Broken array header: %s (%r)" % (path, error))
+        data_offset = npy_file.tell()
+    if dtype.hasobject:
+        raise ValueError("Array of objects: " + path)
+    count = 1
+    for size in shape:
+        count *= size
+    if os.path.getsize(path) != data_offset + count * dtype.itemsize:
+        raise ValueError("Array size mismatch: " + path)
+    return count * dtype.itemsize
+
+def util_entry_size(entry_path):
+    '''bytes of entry (directory or old entry file)'''
+    if not os.path.isdir(entry_path):
+        return os.path.getsize(entry_path)
+    return sum(os.path.getsize(os.path.join(entry_path, name)) for name in os.listdir(entry_path))
+
+def util_entry_remove(entry_path):
+    if os.path.isdir(entry_path):
+        shutil.rmtree(entry_path)
+    else:
+        os.remove(entry_path)
+
+class class_cache_entry(collections.abc.Mapping):
+    '''{name: array} of cache entry. Array is memory mapped (read only) on first use.
+    data_bytes: {name: bytes of array data}'''
+
+    def __init__(self, entry_path, data_bytes):
+        self.entry_path = entry_path
+        self.data_bytes = data_bytes
+        self.arrays = {}
+
+    def __getitem__(self, name):
+        if name not in self.data_bytes:
+            raise KeyError(name)
+        array = self.arrays.get(name)
+        if array is None:
+            # empty array can not be mapped
+            array = np.load(os.path.join(self.entry_path, name + PARSE_CACHE_ARRAY_EXT),
+                            mmap_mode = 'r' if self.data_bytes[name] else None, allow_pickle = False)
+            self.arrays[name] = array
+        return array
+
+    def __iter__(self):
+        return iter(self.data_bytes)
+
+    def __len__(self):
+        return len(self.data_bytes)
+
+class class_parse_cache:
+    '''Cache of decoded chunk arrays: load(filepath) -> class_cache_entry or None, store(filepath, arrays)'''
+
+    def __init__(self, cache_dir = None, max_bytes = 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir or util_cache_default_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # (path, size, mtime_ns) -> hash, for load() and store() of same file
+        self.hashes = {}
+
+    def index_path(self):
+        return os.path.join(self.cache_dir, PARSE_CACHE_INDEX)
+
+    def index_read(self):
+        '''{abs path: [size, mtime_ns, hash]}'''
+        try:
+            with open(self.index_path()) as index_file:
+                index = json.load(index_file)
+        except (IOError, ValueError):
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    def index_write(self, index):
+        # other process can write index at same time: replace whole file
+        (fd, temp_path) = tempfile.mkstemp(dir = self.cache_dir, suffix = '.tmp')
+        with os.fdopen(fd, 'w') as index_file:
+            json.dump(index, index_file)
+        os.replace(temp_path, self.index_path())
+
+    def file_hash(self, filepath, hash_file = True):
+        '''content hash of file, from index if file is unchanged.
+        hash_file: False - None if file is not in index (file is not read)'''
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        file_key = (path, stat.st_size, stat.st_mtime_ns)
+        if file_key in self.hashes:
+            return self.hashes[file_key]
+        entry = self.index_read().get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            self.hashes[file_key] = entry[2]
+            return entry[2]
+        if not hash_file:
+            return None
+        
+        file_hash = hashlib.sha1(PARSE_CACHE_VERSION)
+        with open(path, 'rb') as hash_file:
+            for block in iter(lambda: hash_file.read(1 << 20), b''):
+                file_hash.update(block)
+        file_hash = file_hash.hexdigest()
+        self.hashes[file_key] = file_hash
+        
+        if os.path.isdir(self.cache_dir):
+            index = self.index_read()
+            index[path] = [stat.st_size, stat.st_mtime_ns, file_hash]
+            try:
+                self.index_write(index)
+            except OSError as error:
+                print("Parse cache: can not write index:", error)
+        return file_hash
+
+    def entry_path(self, file_hash):
+        return os.path.join(self.cache_dir, file_hash + PARSE_CACHE_EXT)
+
+    def load(self, filepath, hash_file = True):
+        '''class_cache_entry ({name: array}, arrays are mapped on use) of file or None.
+        Headers and sizes of arrays are checked here, broken entry is a miss and is removed.
+        hash_file: False - only file in index is looked up, unindexed file is a miss (file is not read)'''
+        file_hash = self.file_hash(filepath, hash_file)
+        if file_hash is None:
+            self.misses += 1
+            return None
+        entry_path = self.entry_path(file_hash)
+        if not os.path.isdir(entry_path):
+            self.misses += 1
+            return None
+        try:
+            data_bytes = {}
+            for name in os.listdir(entry_path):
+                if name.endswith(PARSE_CACHE_ARRAY_EXT):
+                    data_bytes[name[:-len(PARSE_CACHE_ARRAY_EXT)]] = util_npy_check(os.path.join(entry_path, name))
+        except (IOError, ValueError, EOFError) as error:
+            print("Parse cache: broken entry removed:", entry_path, error)
+            try:
+                util_entry_remove(entry_path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+        # last use time for eviction
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return class_cache_entry(entry_path, data_bytes)
+
+    def store(self, filepath, arrays):
+        '''store {name: array} of file, then evict old entries. Errors are printed, not raised.'''
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok = True)
+            entry_path = self.entry_path(self.file_hash(filepath))
+            # entry appears at once, complete (other process can load same file)
+            temp_path = tempfile.mkdtemp(dir = self.cache_dir, suffix = '.tmp')
+            for (name, array) in arrays.items():
+                np.save(os.path.join(temp_path, name + PARSE_CACHE_ARRAY_EXT), array, allow_pickle = False)
+            if os.path.isdir(entry_path):
+                # stored by other process meanwhile
+                shutil.rmtree(temp_path)
+            else:
+                os.rename(temp_path, entry_path)
+        except OSError as error:
+            print("Parse cache: can not store entry:", error)
+            if temp_path is not None:
+                shutil.rmtree(temp_path, ignore_errors = True)
+            return
+        self.evict()
+
+    def evict(self):
+        '''remove least recently used entries while total size is over max_bytes'''
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, name)
+            if name.endswith(PARSE_CACHE_OLD_EXTS):
+                # entry of older version: removed first
+                mtime = 0.0
+            elif name.endswith(PARSE_CACHE_EXT):
+                mtime = None
+            else:
+                continue
+            try:
+                if mtime is None:
+                    mtime = os.stat(entry_path).st_mtime
+                size = util_entry_size(entry_path)
+            except OSError:
+                continue
+            entries.append((mtime, size, entry_path))
+        entries.sort()
+        
+        total_bytes = sum(entry[1] for entry in entries)
+        removed = set()
+        for (mtime, size, entry_path) in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                # mapped arrays (entry in use) can not be removed on windows
+                util_entry_remove(entry_path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed.add(os.path.splitext(os.path.basename(entry_path))[0])
+        
+        if removed:
+            index = self.index_read()
+            index = {path: entry for (path, entry) in index.items() if entry[2] not in removed}
+            try:
+                self.index_write(index)
+            except OSError:
+                pass
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((PARSE_CACHE_EXT,) + PARSE_CACHE_OLD_EXTS) or name == PARSE_CACHE_INDEX:
+                util_entry_remove(os.path.join(self.cache_dir, name))
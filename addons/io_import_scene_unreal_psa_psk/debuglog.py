@@ -0,0 +1,91 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Debug log of import (no bpy here).
+
+Chunks are written as tables: rows are formatted by one format string
+and written in blocks, file is written through a large buffer.
+Log without path does nothing (no file is opened).
+'''
+
+import numpy as np
+
+from .pskpsa import util_bytes_to_str
+
+# buffer of log file
+DEBUG_LOG_BUFFER_SIZE = 1 << 20
+# rows formatted at once (limits memory of text)
+DEBUG_LOG_TABLE_ROWS = 1 << 16
+# format of column by numpy dtype kind, floats are written as float32 (7 digits)
+DEBUG_LOG_FORMATS = {
+    'f': '%.7g',
+    'i': '%d',
+    'u': '%d',
+    'b': '%d',
+}
+
+class class_debug_log:
+
+    def __init__(self, path = None):
+        self.path = path
+        self.file = None
+        if path is not None:
+            print("logpath:", path)
+            self.file = open(path, 'w', buffering = DEBUG_LOG_BUFFER_SIZE)
+
+    def write(self, text):
+        if self.file is not None:
+            self.file.write(text)
+
+    def chunk_header(self, chunk):
+        '''VChunkHeader: (chunk_id, type_flag, datasize, datacount, ...)'''
+        if self.file is None:
+            return
+        self.file.write('ChunkID: {0}\nTypeFlag: {1}\nDataSize: {2}\nDataCount: {3}\n'.format(
+                        util_bytes_to_str(chunk[0]), chunk[1], chunk[2], chunk[3]))
+
+    def table(self, *columns, sep = '\t'):
+        '''rows of columns (arrays of same length), 2d columns are written as several columns'''
+        if self.file is None or not columns:
+            return
+        flat_columns = []
+        for column in columns:
+            column = np.asarray(column)
+            if column.dtype.kind == 'S':
+                # names
+                column = np.array([util_bytes_to_str(name) for name in column.ravel().tolist()],
+                                  dtype = str).reshape(column.shape)
+            if column.ndim == 1:
+                flat_columns.append(column)
+            else:
+                flat_columns.extend(column.reshape(len(column), -1).T)
+        
+        # one format for row, rows are formatted by map() (no python code per row)
+        row_format = sep.join(DEBUG_LOG_FORMATS.get(column.dtype.kind, '%s')
+                              for column in flat_columns)
+        for first in range(0, len(flat_columns[0]), DEBUG_LOG_TABLE_ROWS):
+            rows = zip(*[column[first:first + DEBUG_LOG_TABLE_ROWS].tolist()
+                         for column in flat_columns])
+            self.file.write('\n'.join(map(row_format.__mod__, rows)))
+            self.file.write('\n')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,528 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Parsing of psk/psa files (no bpy here).
+
+psk: psk_read() -> class_psk_data
+psa: class_psa_reader (memory mapped, keys of actions are read on demand)
+'''
+
+import mmap
+import numpy as np
+from struct import unpack, unpack_from
+
+# since names have type ANSICHAR(signed char) - using cp1251(or 'ASCII'?)
+def util_bytes_to_str(in_bytes):
+    return in_bytes.rstrip(b'\x00').decode(encoding='cp1252', errors='replace')
+
+PSKPSA_FILE_HEADER = {
+    'psk':{'chunk_id':b'ACTRHEAD\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'},
+    'psa':{'chunk_id':b'ANIMHEAD\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'}
+}
+def util_file_type(filepath):
+    ''''psk' or 'psa' by file header, None for other files'''
+    try:
+        with open(filepath, 'rb') as file:
+            chunk_id = file.read(20)
+    except IOError:
+        return None
+    for ftype in PSKPSA_FILE_HEADER:
+        if chunk_id == PSKPSA_FILE_HEADER[ftype]['chunk_id']:
+            return ftype
+    return None
+
+def util_header_error(ftype, chunk_id):
+    '''error message if chunk_id is not header of ftype file, else None'''
+    if chunk_id != PSKPSA_FILE_HEADER[ftype]['chunk_id']:
+        return ("The selected input file is not a " + ftype +
+                        " file (header mismach)"
+            "\nExpected: "+str(PSKPSA_FILE_HEADER[ftype]['chunk_id'])+
+            "\nPresent: "+str(chunk_id))
+    return None
+
+#=================================================
+#         Chunk records as numpy dtypes
+# https://github.com/gildor2/UModel/blob/master/Exporters/Psk.h
+# (field name, format, offset in record)
+#=================================================
+# VPoint: X|Y|Z
+PSK_VPOINT_FIELDS = (
+    ('co',              ('<f4', 3), 0),
+)
+# VTXNORMS (normal of every point): X|Y|Z
+PSK_VNORMAL_FIELDS = (
+    ('normal',          ('<f4', 3), 0),
+)
+# VVertex: PointIndex|U|V|MatIndex|Reserved|Pad
+PSK_VVERTEX_FIELDS = (
+    ('point_index',     '<u4',      0),
+    ('u',               '<f4',      4),
+    ('v',               '<f4',      8),
+    ('mat_index',       'u1',       12),
+)
+# VTriangle: WdgIdx1|WdgIdx2|WdgIdx3|MatIdx|AuxMatIdx|SmthGrp
+PSK_VTRIANGLE_FIELDS = (
+    ('wedge_index',     ('<u2', 3), 0),
+    ('mat_index',       'u1',       6),
+    ('aux_mat_index',   'u1',       7),
+    ('smoothing_groups','<u4',      8),
+)
+# VTriangle32 (FACE3200, more than 65536 wedges): WdgIdx1|WdgIdx2|WdgIdx3|MatIdx|AuxMatIdx|SmthGrp
+PSK_VTRIANGLE32_FIELDS = (
+    ('wedge_index',     ('<u4', 3), 0),
+    ('mat_index',       'u1',       12),
+    ('aux_mat_index',   'u1',       13),
+    ('smoothing_groups','<u4',      14),
+)
+# VRawBoneInfluence: Weight|PntIdx|BoneIdx
+PSK_VRAWBONEINFLUENCE_FIELDS = (
+    ('weight',          '<f4',      0),
+    ('point_index',     '<i4',      4),
+    ('bone_index',      '<i4',      8),
+)
+# VERTEXCOLOR (color of every wedge): R|G|B|A
+PSK_VCOLOR_FIELDS = (
+    ('color',           ('u1', 4),  0),
+)
+# VMorphInfo (MRPHINFO, one per morph target): Name|NumVertices
+PSK_VMORPHINFO_FIELDS = (
+    ('name',            'S64',      0),
+    ('num_vertices',    '<i4',      64),
+)
+# VMorphData (MRPHDATA, deltas of all morph targets, in order of MRPHINFO): PositionDelta|TangentZDelta|PointIdx
+PSK_VMORPHDATA_FIELDS = (
+    ('position_delta',  ('<f4', 3), 0),
+    ('tangent_z_delta', ('<f4', 3), 12),
+    ('point_index',     '<i4',      24),
+)
+# VMeshUV (EXTRAUVS<n>, uv of every wedge): U|V
+PSK_VMESHUV_FIELDS = (
+    ('u',               '<f4',      0),
+    ('v',               '<f4',      4),
+)
+
+# VMaterial: Name|TextureIndex|PolyFlags|AuxMaterial|AuxFlags|LodBias|LodStyle
+PSK_VMATERIAL_FIELDS = (
+    ('name',            'S64',      0),
+    ('texture_index',   '<i4',      64),
+    ('poly_flags',      '<u4',      68),
+    ('aux_material',    '<i4',      72),
+    ('aux_flags',       '<u4',      76),
+    ('lod_bias',        '<i4',      80),
+    ('lod_style',       '<i4',      84),
+)
+# VBone, FNamedBoneBinary: Name|Flgs|NumChld|PrntIdx|Qx|Qy|Qz|Qw|LocX|LocY|LocZ|Lngth|XSize|YSize|ZSize
+PSKPSA_VBONE_FIELDS = (
+    ('name',            'S64',      0),
+    ('flags',           '<u4',      64),
+    ('num_children',    '<i4',      68),
+    ('parent_index',    '<i4',      72),
+    ('quat',            ('<f4', 4), 76),
+    ('pos',             ('<f4', 3), 92),
+    ('length',          '<f4',      104),
+    ('size',            ('<f4', 3), 108),
+)
+# AnimInfoBinary: Name|Group|TotalBones|RootInclude|KeyCompressionStyle|KeyQuotum|
+#   KeyReduction|TrackTime|AnimRate|StartBone|FirstRawFrame|NumRawFrames
+PSA_ANIMINFO_FIELDS = (
+    ('name',            'S64',      0),
+    ('group',           'S64',      64),
+    ('total_bones',     '<i4',      128),
+    ('root_include',    '<i4',      132),
+    ('key_compression_style', '<i4', 136),
+    ('key_quotum',      '<i4',      140),
+    ('key_reduction',   '<f4',      144),
+    ('track_time',      '<f4',      148),
+    ('anim_rate',       '<f4',      152),
+    ('start_bone',      '<i4',      156),
+    ('first_raw_frame', '<i4',      160),
+    ('num_raw_frames',  '<i4',      164),
+)
+# VQuatAnimKey: Position|Orientation(x, y, z, w)|Time
+PSA_VQUATANIMKEY_FIELDS = (
+    ('pos',             ('<f4', 3), 0),
+    ('quat',            ('<f4', 4), 12),
+    ('time',            '<f4',      28),
+)
+
+def util_chunk_dtype(fields, datasize = None):
+    '''numpy dtype for chunk record. Record size is taken from VChunkHeader.DataSize,
+    so unknown trailing bytes of newer exporters are skipped.'''
+    record_size = max(offset + np.dtype(fmt).itemsize for (name, fmt, offset) in fields)
+    if datasize is None:
+        datasize = record_size
+    if datasize < record_size:
+        raise ValueError("Chunk record is too small: %i (expected %i)" % (datasize, record_size))
+    return np.dtype({
+        'names':    [field[0] for field in fields],
+        'formats':  [field[1] for field in fields],
+        'offsets':  [field[2] for field in fields],
+        'itemsize': datasize
+        })
+
+def util_chunk_array(fields, chunk_data, datasize, datacount):
+    '''decode chunk data to structured array (no per-record python work)'''
+    return np.frombuffer(chunk_data, dtype = util_chunk_dtype(fields, datasize), count = datacount)
+
+# VChunkHeader (+ data offset) as record, for parse cache
+PSKPSA_CHUNK_DTYPE = np.dtype([('chunk_id',     'S20'),
+                               ('type_flag',    '<i4'),
+                               ('datasize',     '<i4'),
+                               ('datacount',    '<i4'),
+                               ('data_offset',  '<i8')])
+
+def util_chunks_to_array(chunks):
+    chunks_array = np.zeros(len(chunks), dtype = PSKPSA_CHUNK_DTYPE)
+    for (index, chunk) in enumerate(chunks):
+        chunks_array[index] = tuple(chunk) + (0,) * (5 - len(chunk))
+    return chunks_array
+
+def util_chunks_from_array(chunks_array, fields = 5):
+    '''[(chunk_id, type_flag, datasize, datacount[, data_offset]), ...]'''
+    # numpy strips trailing zero bytes of chunk_id
+    return [(chunk[0].ljust(20, b'\x00'),) + chunk[1:fields]
+            for chunk in chunks_array.tolist()]
+
+class class_psk_data:
+    '''Parsed psk file. Chunk records are numpy structured arrays (see *_FIELDS).'''
+    filepath = ""
+    # [(chunk_id, type_flag, datasize, datacount, data_offset), ...] in file order (all chunks)
+    chunks = None
+    # chunk name -> chunk (first chunk of name)
+    chunks_by_name = None
+    # class_psk_data attribute -> chunk it is read from
+    data_chunks = None
+    # PNTS0000 (VPoint)
+    points = None
+    # VTXW0000 (VVertex)
+    wedges = None
+    # FACE0000 (VTriangle) or FACE3200 (VTriangle32)
+    faces = None
+    # MATT0000 (VMaterial)
+    materials = None
+    # REFSKELT, REFSKEL0 (VBone)
+    bones = None
+    # RAWWEIGHTS, RAWW0000 (VRawBoneInfluence)
+    influences = None
+    # VTXNORMS (VNormal), pskx
+    normals = None
+    # VERTEXCOLOR (VColor), pskx
+    colors = None
+    # MRPHINFO (VMorphInfo), pskx
+    morph_infos = None
+    # MRPHDATA (VMorphData), pskx
+    morph_deltas = None
+    # [EXTRAUVS0, EXTRAUVS1, ...] (VMeshUV), pskx
+    extra_uvs = None
+
+    def index_chunks(self):
+        '''chunks_by_name and data_chunks from chunks'''
+        self.chunks_by_name = {}
+        self.data_chunks = {}
+        for chunk in self.chunks:
+            chunk_name = util_bytes_to_str(chunk[0])
+            self.chunks_by_name.setdefault(chunk_name, chunk)
+            name = util_psk_chunk_attribute(chunk_name)[0]
+            if name is not None:
+                self.data_chunks.setdefault(name, chunk)
+
+# chunk name -> (class_psk_data attribute, fields). First chunk of attribute is read, other chunks are skipped.
+PSK_CHUNKS = {
+    'PNTS0000':     ('points',      PSK_VPOINT_FIELDS),
+    'VTXW0000':     ('wedges',      PSK_VVERTEX_FIELDS),
+    'FACE0000':     ('faces',       PSK_VTRIANGLE_FIELDS),
+    'FACE3200':     ('faces',       PSK_VTRIANGLE32_FIELDS),
+    'MATT0000':     ('materials',   PSK_VMATERIAL_FIELDS),
+    'REFSKELT':     ('bones',       PSKPSA_VBONE_FIELDS),
+    'REFSKEL0':     ('bones',       PSKPSA_VBONE_FIELDS),
+    'RAWWEIGHTS':   ('influences',  PSK_VRAWBONEINFLUENCE_FIELDS),
+    'RAWW0000':     ('influences',  PSK_VRAWBONEINFLUENCE_FIELDS),
+    'VTXNORMS':     ('normals',     PSK_VNORMAL_FIELDS),
+    'VERTEXCOLOR':  ('colors',      PSK_VCOLOR_FIELDS),
+    'MRPHINFO':     ('morph_infos', PSK_VMORPHINFO_FIELDS),
+    'MRPHDATA':     ('morph_deltas', PSK_VMORPHDATA_FIELDS),
+}
+# chunk name prefix -> (class_psk_data attribute, fields). Attribute is list of arrays of all chunks of prefix.
+PSK_LIST_CHUNKS = {
+    'EXTRAUVS':     ('extra_uvs',   PSK_VMESHUV_FIELDS),
+}
+# class_psk_data attribute -> chunk, for parse cache
+PSK_DATA_CHUNKS = ('points', 'wedges', 'faces', 'materials', 'bones', 'influences', 'normals', 'colors',
+                   'morph_infos', 'morph_deltas')
+# class_psk_data attribute -> list of chunks, for parse cache (as <name>_<index>)
+PSK_LIST_DATA_CHUNKS = ('extra_uvs',)
+# attributes without chunk in file are empty arrays
+PSK_DATA_FIELDS = {
+    'points':       PSK_VPOINT_FIELDS,
+    'wedges':       PSK_VVERTEX_FIELDS,
+    'faces':        PSK_VTRIANGLE_FIELDS,
+    'materials':    PSK_VMATERIAL_FIELDS,
+    'bones':        PSKPSA_VBONE_FIELDS,
+    'influences':   PSK_VRAWBONEINFLUENCE_FIELDS,
+    'normals':      PSK_VNORMAL_FIELDS,
+    'colors':       PSK_VCOLOR_FIELDS,
+    'morph_infos':  PSK_VMORPHINFO_FIELDS,
+    'morph_deltas': PSK_VMORPHDATA_FIELDS,
+}
+
+def util_psk_chunk_attribute(chunk_name):
+    '''(class_psk_data attribute, fields, attribute is list) for chunk or (None, None, False)'''
+    if chunk_name in PSK_CHUNKS:
+        return PSK_CHUNKS[chunk_name] + (False,)
+    for (prefix, (name, fields)) in PSK_LIST_CHUNKS.items():
+        if chunk_name.startswith(prefix):
+            return (name, fields, True)
+    return (None, None, False)
+
+# attributes read in skeleton only mode (payload of other chunks is skipped)
+PSK_SKELETON_CHUNKS = ('bones',)
+# attributes, which chunk must be in file
+PSK_REQUIRED_CHUNKS = {
+    'mesh':         ('points', 'wedges', 'faces', 'bones'),
+    'skeleton':     ('bones',),
+}
+
+#=================================================
+#         VChunkHeader Struct
+# ChunkID|TypeFlag|DataSize|DataCount
+# 0      |1       |2       |3
+#=================================================
+def psk_read(filepath, stats = None, cache = None, mesh = True):
+    '''Parse psk file to class_psk_data. Raises IOError or ValueError.
+    Chunks are found by ID, in any order. Unknown chunks are skipped.
+    mesh: False - only skeleton is read (payload of other chunks is skipped, attributes are None).
+    stats: optional class_import_stats, gets one span per read chunk.
+    cache: optional class_parse_cache, decoded chunks are loaded from it or stored to it
+    (skeleton only: loaded if file is in cache index, file is not hashed and not stored).'''
+    psk = class_psk_data()
+    psk.filepath = filepath
+    psk.chunks = []
+    required = PSK_REQUIRED_CHUNKS['mesh' if mesh else 'skeleton']
+    read_names = PSK_DATA_CHUNKS + PSK_LIST_DATA_CHUNKS if mesh else PSK_SKELETON_CHUNKS
+    
+    if cache is not None:
+        if stats is not None:
+            stats.begin('cache load')
+        # skeleton only: entry of indexed file is used, other file is not hashed (nothing is stored for it)
+        arrays = cache.load(filepath, hash_file = mesh)
+        if stats is not None:
+            stats.end()
+        if arrays is not None and all(name in arrays for name in ('chunks',) + required):
+            psk.chunks = util_chunks_from_array(arrays['chunks'])
+            psk.index_chunks()
+            # arrays are mapped on use: other arrays of entry are not touched
+            for name in read_names:
+                if name in PSK_LIST_DATA_CHUNKS:
+                    count = sum(1 for array_name in arrays if array_name.startswith(name + '_'))
+                    setattr(psk, name, [arrays[name + '_' + str(index)] for index in range(count)])
+                else:
+                    setattr(psk, name, arrays.get(name))
+            util_psk_data_fill(psk, mesh)
+            return psk
+    
+    with open(filepath, 'rb') as pskfile:
+        offset = 0
+        while True:
+            header = pskfile.read(32)
+            if len(header) < 32:
+                # end of file
+                break
+            (chunk_id, type_flag, datasize, datacount) = unpack('20s3i', header)
+            offset += 32
+            chunk = (chunk_id, type_flag, datasize, datacount, offset)
+            psk.chunks.append(chunk)
+            data_size = max(0, datasize * datacount)
+            offset += data_size
+            
+            if len(psk.chunks) == 1:
+                # General
+                error = util_header_error('psk', chunk_id)
+                if error is not None:
+                    raise ValueError(error)
+            
+            chunk_name = util_bytes_to_str(chunk_id)
+            (name, fields, is_list) = util_psk_chunk_attribute(chunk_name)
+            if name not in read_names or (not is_list and getattr(psk, name) is not None):
+                # not needed or unknown chunk
+                pskfile.seek(offset)
+                continue
+            
+            if stats is not None:
+                stats.begin('chunk ' + chunk_name, datacount)
+            chunk_data = pskfile.read(data_size)
+            if len(chunk_data) < data_size:
+                raise ValueError("Unexpected end of file: " + filepath)
+            chunk_array = util_chunk_array(fields, chunk_data, datasize, datacount)
+            if is_list:
+                if getattr(psk, name) is None:
+                    setattr(psk, name, [])
+                getattr(psk, name).append(chunk_array)
+            else:
+                setattr(psk, name, chunk_array)
+            if stats is not None:
+                stats.end()
+    
+    if not psk.chunks:
+        raise ValueError(util_header_error('psk', b''))
+    psk.index_chunks()
+    for name in required:
+        if getattr(psk, name) is None:
+            raise ValueError("Chunk not found: " + name + "\n" + filepath)
+        
+    if cache is not None and mesh:
+        if stats is not None:
+            stats.begin('cache store')
+        arrays = {name: getattr(psk, name) for name in PSK_DATA_CHUNKS if getattr(psk, name) is not None}
+        for name in PSK_LIST_DATA_CHUNKS:
+            for (index, chunk_array) in enumerate(getattr(psk, name) or []):
+                arrays[name + '_' + str(index)] = chunk_array
+        arrays['chunks'] = util_chunks_to_array(psk.chunks)
+        cache.store(filepath, arrays)
+        if stats is not None:
+            stats.end()
+    util_psk_data_fill(psk, mesh)
+    return psk
+
+def util_psk_data_fill(psk, mesh):
+    '''attributes of chunks, that are not in file, get empty arrays (empty lists)'''
+    for name in (PSK_DATA_CHUNKS if mesh else PSK_SKELETON_CHUNKS):
+        if getattr(psk, name) is None:
+            setattr(psk, name, np.zeros(0, dtype = util_chunk_dtype(PSK_DATA_FIELDS[name])))
+    if mesh:
+        for name in PSK_LIST_DATA_CHUNKS:
+            if getattr(psk, name) is None:
+                setattr(psk, name, [])
+
+class class_psa_reader:
+    '''Parsed psa file, mapped to memory.
+    On open only chunk headers are read (chunk index) and ANIMINFO is decoded (actions index).
+    Chunk data and keys of every action are zero-copy numpy views of the file.
+    Raises IOError (file can not be opened) or ValueError (not psa or broken file), file is closed then.
+    Psa is not stored in parse cache: keys are raw records, mapped file is read without decoding.'''
+    filepath = ""
+    # [(chunk_id, type_flag, datasize, datacount, data_offset), ...] in file order
+    chunks = None
+    # chunk name -> chunk
+    chunks_by_name = None
+    # BONENAMES (FNamedBoneBinary)
+    bones = None
+    # ANIMINFO (AnimInfoBinary)
+    actions = None
+    # index of first key of action in ANIMKEYS
+    actions_key_offset = None
+    mmap = None
+    file = None
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, 'rb')
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            self.file.close()
+            raise IOError("Can not map file: " + filepath)
+
+        # header is checked before chunks are walked (file of other type is not indexed)
+        header_error = util_header_error('psa', unpack_from('20s', self.mmap)[0] if len(self.mmap) >= 32 else b'')
+        if header_error is not None:
+            self.close()
+            raise ValueError(header_error)
+        try:
+            self.chunks = []
+            file_size = len(self.mmap)
+            offset = 0
+            while offset + 32 <= file_size:
+                (chunk_id, type_flag, datasize, datacount) = unpack_from('20s3i', self.mmap, offset)
+                offset += 32
+                self.chunks.append((chunk_id, type_flag, datasize, datacount, offset))
+                offset += max(0, datasize * datacount)
+                if offset > file_size:
+                    raise ValueError("Chunk %s ends after end of file: %i (%i)" % (
+                                     util_bytes_to_str(chunk_id), offset, file_size))
+            
+            self.index_chunks()
+        except ValueError as error:
+            # truncated or malformed file (chunk out of file, ANIMINFO can not be decoded)
+            self.close()
+            raise ValueError("Broken psa file: " + str(error) + "\n" + filepath)
+
+    def index_chunks(self):
+        '''chunks_by_name, bones, actions and actions_key_offset from chunks'''
+        self.chunks_by_name = {}
+        for chunk in self.chunks:
+            self.chunks_by_name.setdefault(util_bytes_to_str(chunk[0]), chunk)
+            
+        if 'BONENAMES' in self.chunks_by_name:
+            self.bones = self.chunk_array('BONENAMES', PSKPSA_VBONE_FIELDS)
+        if 'ANIMINFO' in self.chunks_by_name:
+            self.actions = self.chunk_array('ANIMINFO', PSA_ANIMINFO_FIELDS)
+            # keys of actions are stored one after another
+            keys_per_action = self.actions['total_bones'].astype(np.int64) * self.actions['num_raw_frames']
+            self.actions_key_offset = np.concatenate(([0], np.cumsum(keys_per_action)[:-1]))
+
+    def chunk_array(self, chunk_name, fields, first = 0, count = None):
+        '''records [first, first + count) of chunk as numpy view'''
+        (chunk_id, type_flag, datasize, datacount, offset) = self.chunks_by_name[chunk_name]
+        if count is None:
+            count = datacount - first
+        if first < 0 or count < 0 or first + count > datacount:
+            raise ValueError("Records out of chunk %s range: %i, %i (%i)" % (chunk_name, first, count, datacount))
+        return np.frombuffer(self.mmap, dtype = util_chunk_dtype(fields, datasize),
+                             count = count, offset = offset + first * datasize)
+
+    def action_keys(self, action_index):
+        '''VQuatAnimKey records of action as (frames, bones) view'''
+        action = self.actions[action_index]
+        (frames, bones) = (int(action['num_raw_frames']), int(action['total_bones']))
+        keys = self.chunk_array('ANIMKEYS', PSA_VQUATANIMKEY_FIELDS,
+                                int(self.actions_key_offset[action_index]), frames * bones)
+        return keys.reshape(frames, bones)
+
+    def close(self):
+        self.bones = None
+        self.actions = None
+        if self.mmap is None:
+            return
+        try:
+            self.mmap.close()
+        except BufferError:
+            # numpy views are still alive, mmap will be closed with them
+            pass
+        self.file.close()
+
+def util_psa_scan_actions(filepath):
+    '''Actions of psa file from ANIMINFO chunk. Keys are not read.
+    Returns [(name, group, frames, bones), ...] or None if file is not psa.'''
+    try:
+        psa_reader = class_psa_reader(filepath)
+    except (IOError, ValueError):
+        # not psa, broken or unreadable file
+        return None
+    try:
+        if psa_reader.actions is None:
+            return None
+        return list(zip(map(util_bytes_to_str, psa_reader.actions['name'].tolist()),
+                        map(util_bytes_to_str, psa_reader.actions['group'].tolist()),
+                        psa_reader.actions['num_raw_frames'].tolist(),
+                        psa_reader.actions['total_bones'].tolist()))
+    except ValueError:
+        return None
+    finally:
+        psa_reader.close()
@@ -0,0 +1,351 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Skeleton as arrays and quaternion / matrix math of many bones at once (no bpy here).
+
+Quaternions are (w, x, y, z), matrices are for column vectors (as mathutils).
+'''
+
+import numpy as np
+
+def util_quat_conjugated(quats):
+    return quats * np.array((1.0, -1.0, -1.0, -1.0))
+
+def util_quat_to_mat3(quats):
+    '''(..., 4) -> (..., 3, 3). Same as mathutils Quaternion.to_matrix()'''
+    (w, x, y, z) = (quats[..., 0], quats[..., 1], quats[..., 2], quats[..., 3])
+    mats = np.empty(quats.shape[:-1] + (3, 3))
+    mats[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    mats[..., 0, 1] = 2.0 * (x * y - w * z)
+    mats[..., 0, 2] = 2.0 * (x * z + w * y)
+    mats[..., 1, 0] = 2.0 * (x * y + w * z)
+    mats[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    mats[..., 1, 2] = 2.0 * (y * z - w * x)
+    mats[..., 2, 0] = 2.0 * (x * z - w * y)
+    mats[..., 2, 1] = 2.0 * (y * z + w * x)
+    mats[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return mats
+
+def util_mat3_to_quat(mats):
+    '''(..., 3, 3) -> (..., 4). Same branches as Blender's mat3_to_quat,
+    so signs of quaternions match the values Blender stores in pose bones.'''
+    mats = mats / np.linalg.norm(mats, axis = -2)[..., np.newaxis, :]
+    m = lambda row, col: mats[..., row, col]
+    quats = np.empty(mats.shape[:-2] + (4,))
+
+    tr = 0.25 * (1.0 + m(0,0) + m(1,1) + m(2,2))
+
+    big_w = tr > np.finfo(np.float32).eps
+    big_x = ~big_w & (m(0,0) > m(1,1)) & (m(0,0) > m(2,2))
+    big_y = ~big_w & ~big_x & (m(1,1) > m(2,2))
+    big_z = ~big_w & ~big_x & ~big_y
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        s = np.sqrt(tr)
+        quats[big_w] = np.stack((s,
+                                 (m(2,1) - m(1,2)) / (4.0 * s),
+                                 (m(0,2) - m(2,0)) / (4.0 * s),
+                                 (m(1,0) - m(0,1)) / (4.0 * s)), axis = -1)[big_w]
+        s = 2.0 * np.sqrt(1.0 + m(0,0) - m(1,1) - m(2,2))
+        quats[big_x] = np.stack(((m(2,1) - m(1,2)) / s,
+                                 0.25 * s,
+                                 (m(0,1) + m(1,0)) / s,
+                                 (m(0,2) + m(2,0)) / s), axis = -1)[big_x]
+        s = 2.0 * np.sqrt(1.0 + m(1,1) - m(0,0) - m(2,2))
+        quats[big_y] = np.stack(((m(0,2) - m(2,0)) / s,
+                                 (m(0,1) + m(1,0)) / s,
+                                 0.25 * s,
+                                 (m(1,2) + m(2,1)) / s), axis = -1)[big_y]
+        s = 2.0 * np.sqrt(1.0 + m(2,2) - m(0,0) - m(1,1))
+        quats[big_z] = np.stack(((m(1,0) - m(0,1)) / s,
+                                 (m(0,2) + m(2,0)) / s,
+                                 (m(1,2) + m(2,1)) / s,
+                                 0.25 * s), axis = -1)[big_z]
+
+    return quats / np.linalg.norm(quats, axis = -1)[..., np.newaxis]
+
+def util_mat4_from_loc_quat(locs, quats):
+    '''Matrix.Translation(loc) * quat.to_matrix().to_4x4()'''
+    mats = np.zeros(quats.shape[:-1] + (4, 4))
+    mats[..., :3, :3] = util_quat_to_mat3(quats)
+    mats[..., :3, 3] = locs
+    mats[..., 3, 3] = 1.0
+    return mats
+
+def util_bone_roll_to_vectors(dirs, ups):
+    '''roll of bones with direction head -> tail dirs (unit), so bone z axis is closest to ups.
+    Same as EditBone.align_roll(up) (ED_armature_ebone_roll_to_vector of Blender).'''
+    eps = np.finfo(np.float32).eps
+    (x, y, z) = (dirs[:, 0], dirs[:, 1], dirs[:, 2])
+    
+    # z axis of bone with roll 0 (column 2 of vec_roll_to_mat3_normalized())
+    z_axis = np.zeros_like(dirs)
+    theta = 1.0 + y
+    general = theta > 1.0e-5
+    near_neg_y = ~general & ((x != 0.0) | (z != 0.0)) & (theta > 1.0e-9)
+    neg_y = ~general & ~near_neg_y
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        z_axis[general, 0] = (-x * z / theta)[general]
+        z_axis[general, 2] = (1.0 - z * z / theta)[general]
+        theta_xz = x * x + z * z
+        z_axis[near_neg_y, 0] = (2.0 * x * z / theta_xz)[near_neg_y]
+        z_axis[near_neg_y, 2] = ((x + z) * (x - z) / theta_xz)[near_neg_y]
+    z_axis[:, 1] = -z
+    z_axis[neg_y] = (0.0, 0.0, 1.0)
+    
+    # up projected to plane of bone direction
+    ups_dot_dirs = np.einsum('ij,ij->i', ups, dirs)
+    ups_proj = ups - dirs * ups_dot_dirs[:, np.newaxis]
+    
+    cross = np.cross(z_axis, ups_proj)
+    rolls = np.arctan2(np.linalg.norm(cross, axis = 1), np.einsum('ij,ij->i', z_axis, ups_proj))
+    rolls = np.where(np.einsum('ij,ij->i', cross, dirs) < 0.0, -rolls, rolls)
+    # up is along bone: roll is not changed (0)
+    return np.where(np.abs(ups_dot_dirs) >= 1.0 - eps, 0.0, rolls)
+
+def util_skeleton_depths(parent_indexes):
+    '''depth of every bone in hierarchy (roots: 0) and parent_indexes without cycles.
+    Bones of parent cycle become roots (first bone of cycle by index).'''
+    parent_indexes = np.array(parent_indexes, dtype = np.int32)
+    depths = np.where(parent_indexes < 0, 0, -1)
+    while True:
+        pending = depths < 0
+        if not pending.any():
+            break
+        # parents of pending bones are >= 0
+        ready = pending.copy()
+        ready[pending] = depths[parent_indexes[pending]] >= 0
+        if not ready.any():
+            # cycle: break it at first pending bone
+            root_index = np.flatnonzero(pending)[0]
+            parent_indexes[root_index] = -1
+            depths[root_index] = 0
+            continue
+        depths[ready] = depths[parent_indexes[ready]] + 1
+    return (depths, parent_indexes)
+
+class class_skeleton:
+    '''Bones as arrays, index of arrays is bone index (as in file).
+    order: bone indexes with parents before children (stable by index),
+    levels: order split by depth, bones of one level do not depend on each other.'''
+    names = None
+    # parent bone index or -1 (root)
+    parent_indexes = None
+    depths = None
+    order = None
+    levels = None
+    # (bones, 4) (w, x, y, z) and (bones, 3), as stored in file (VJointPos)
+    local_quats = None
+    local_positions = None
+
+    def __init__(self, names, parent_indexes, local_quats = None, local_positions = None):
+        self.names = list(names)
+        (self.depths, self.parent_indexes) = util_skeleton_depths(parent_indexes)
+        self.order = np.argsort(self.depths, kind = 'mergesort').astype(np.int32)
+        self.levels = np.split(self.order, np.flatnonzero(np.diff(self.depths[self.order])) + 1)
+        if local_quats is not None:
+            self.local_quats = np.asarray(local_quats, dtype = np.float64)
+            self.local_positions = np.asarray(local_positions, dtype = np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def local_matrices(self):
+        '''(bones, 4, 4) bone matrix relative to parent.
+        Rotation of root bones is used as is, rotation of other bones is inverted.'''
+        rotations = util_quat_to_mat3(self.local_quats)
+        is_child = self.parent_indexes >= 0
+        rotations[is_child] = np.linalg.inv(rotations[is_child])
+        mats = np.zeros((len(self), 4, 4))
+        mats[:, :3, :3] = rotations
+        mats[:, :3, 3] = self.local_positions
+        mats[:, 3, 3] = 1.0
+        return mats
+
+    def global_matrices(self):
+        '''(bones, 4, 4) bone matrix in armature space, one matmul per hierarchy level'''
+        mats = self.local_matrices()
+        for level in self.levels[1:]:
+            mats[level] = np.matmul(mats[self.parent_indexes[level]], mats[level])
+        return mats
+
+def util_skeleton_from_psk(bones, names):
+    '''class_skeleton of REFSKEL0 (VBone) records.
+    Root: first bone, bone with parent index of itself or out of range.'''
+    bones_count = len(bones)
+    parent_indexes = bones['parent_index'].astype(np.int32)
+    is_root = ((parent_indexes == np.arange(bones_count))
+               | (parent_indexes < 0) | (parent_indexes >= bones_count))
+    parent_indexes[is_root] = -1
+    # (x, y, z, w) -> (w, x, y, z)
+    return class_skeleton(names, parent_indexes,
+                          bones['quat'][:, (3, 0, 1, 2)], bones['pos'])
+
+# end of bone name prefix ("Bip01 ", "b_", "mixamorig:")
+BONE_NAME_PREFIX_SEPARATORS = ' _:|.'
+
+def util_bone_name_prefix(folded_names):
+    '''prefix of half of names or more (lowercase names), empty string if there is none'''
+    counts = {}
+    for name in folded_names:
+        for (end, char) in enumerate(name):
+            if char in BONE_NAME_PREFIX_SEPARATORS:
+                if end > 0:
+                    prefix = name[:end + 1]
+                    counts[prefix] = counts.get(prefix, 0) + 1
+                break
+    if not counts:
+        return ''
+    (count, prefix) = max((count, prefix) for (prefix, count) in counts.items())
+    return prefix if 2 * count >= len(folded_names) else ''
+
+class class_bone_name_index:
+    '''Bone names of skeleton, for mapping bones of other skeleton (psa) to its bones.
+    Name is matched exactly, then case-insensitive, then without prefix of most bones
+    of each skeleton (case-insensitive). First bone of same name is used.'''
+
+    def __init__(self, names):
+        self.names = list(names)
+        folded_names = [name.strip().lower() for name in self.names]
+        self.prefix = util_bone_name_prefix(folded_names)
+        self.exact = {}
+        self.folded = {}
+        self.stripped = {}
+        for (index, (name, folded_name)) in enumerate(zip(self.names, folded_names)):
+            self.exact.setdefault(name, index)
+            self.folded.setdefault(folded_name, index)
+            if self.prefix and folded_name.startswith(self.prefix):
+                folded_name = folded_name[len(self.prefix):]
+            self.stripped.setdefault(folded_name, index)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, names):
+        '''index of every name in this skeleton or -1 (numpy array).
+        Exact matches are found first. Bone is matched by one name only.'''
+        folded_names = [name.strip().lower() for name in names]
+        prefix = util_bone_name_prefix(folded_names)
+        stripped_names = [folded_name[len(prefix):] if prefix and folded_name.startswith(prefix) else folded_name
+                          for folded_name in folded_names]
+        indexes = np.full(len(folded_names), -1, dtype = np.int32)
+        used = set()
+        for (keys, indexes_by_key) in ((names, self.exact),
+                                       (folded_names, self.folded),
+                                       (stripped_names, self.stripped)):
+            for (other_index, key) in enumerate(keys):
+                index = indexes_by_key.get(key)
+                if indexes[other_index] >= 0 or index is None or index in used:
+                    continue
+                used.add(index)
+                indexes[other_index] = index
+        return indexes
+
+    def key_indexes(self, names):
+        '''inverse of lookup(): index in names of every bone of this skeleton or -1 (numpy array)'''
+        indexes = self.lookup(names)
+        found = np.flatnonzero(indexes >= 0)
+        key_indexes = np.full(len(self.names), -1, dtype = np.int32)
+        key_indexes[indexes[found]] = found
+        return key_indexes
+
+def util_psa_action_key_indexes(key_indexes, total_bones):
+    '''key_indexes (see class_bone_name_index.key_indexes()) for action with keys of first total_bones
+    psa bones (AnimInfoBinary.TotalBones): bones of other psa bones are without animation (-1)'''
+    return np.where(key_indexes < total_bones, key_indexes, -1)
+
+def util_psa_solve_keys(skeleton, key_indexes,
+                        matrix_rest, matrix_basis, matrix_fix,
+                        keys_pos, keys_quat):
+    '''Calculate pose bones location and rotation_quaternion for all frames of action.
+    Gives the same values as setting pose_bone.matrix and updating scene, bone by bone.
+    Bones of one hierarchy level are calculated at once.
+
+    Pose bones (as armature_obj.pose.bones):
+      skeleton         - class_skeleton of pose bones (parent_indexes, levels)
+      key_indexes      - index of bone in keys or -1 (bone without animation)
+      matrix_rest      - (bones, 4, 4) bone.matrix_local
+      matrix_basis     - (bones, 4, 4) pose_bone.matrix_basis (used by bones without animation)
+    matrix_fix - rotation applied to psa bone matrix to get pose bone matrix
+    Keys (VQuatAnimKey):
+      keys_pos  - (frames, psa bones, 3)
+      keys_quat - (frames, psa bones, 4) as (w, x, y, z)
+
+    Returns (locations, quaternions) of shape (frames, bones, 3|4).
+    '''
+    frames = keys_pos.shape[0]
+    bones_count = len(skeleton)
+    parent_indexes = skeleton.parent_indexes
+    key_indexes = np.asarray(key_indexes)
+
+    locations = np.zeros((frames, bones_count, 3))
+    quaternions = np.zeros((frames, bones_count, 4))
+    quaternions[..., 0] = 1.0
+
+    # psa bone matrix in armature space
+    transform = np.empty((frames, bones_count, 4, 4))
+    # pose bone matrix in armature space (pose_bone.matrix)
+    pose = np.empty((frames, bones_count, 4, 4))
+
+    for level in skeleton.levels:
+        parents = parent_indexes[level]
+        is_root = parents < 0
+        
+        # rest matrix of bone relative to parent pose
+        rest_offset = np.broadcast_to(matrix_rest[level], (frames,) + matrix_rest[level].shape).copy()
+        (children, children_parents) = (level[~is_root], parents[~is_root])
+        if len(children):
+            rest_offset[:, ~is_root] = np.matmul(
+                    pose[:, children_parents],
+                    np.matmul(np.linalg.inv(matrix_rest[children_parents]), matrix_rest[children]))
+        
+        # bones without animation keep their basis, children are calculated from their pose
+        # (as from pose_bone.matrix, evaluated with keys of parents)
+        is_keyed = key_indexes[level] >= 0
+        unkeyed = level[~is_keyed]
+        pose[:, unkeyed] = np.matmul(rest_offset[:, ~is_keyed], matrix_basis[unkeyed])
+        transform[:, unkeyed] = pose[:, unkeyed]
+        if not is_keyed.any():
+            continue
+
+        keyed = level[is_keyed]
+        keyed_parents = parents[is_keyed]
+        keyed_roots = is_root[is_keyed]
+        pos = keys_pos[:, key_indexes[keyed]]
+        quat = keys_quat[:, key_indexes[keyed]]
+        
+        # rotation of root is stored as is, rotations of children are stored inverted
+        # (as VJointPos of psk bones, see class_skeleton.local_matrices()): children are
+        # calculated from parent with conjugated quaternion, roots in armature space
+        quat = np.where(keyed_roots[:, np.newaxis], quat, util_quat_conjugated(quat))
+        mat = util_mat4_from_loc_quat(pos, quat)
+        keyed_children = ~keyed_roots
+        if keyed_children.any():
+            mat[:, keyed_children] = np.matmul(transform[:, keyed_parents[keyed_children]],
+                                               mat[:, keyed_children])
+        transform[:, keyed] = mat
+        pose[:, keyed] = np.matmul(mat, matrix_fix)
+
+        # pose_bone.matrix -> pose_bone.matrix_basis
+        basis = np.matmul(np.linalg.inv(rest_offset[:, is_keyed]), pose[:, keyed])
+
+        locations[:, keyed] = basis[..., :3, 3]
+        quaternions[:, keyed] = util_mat3_to_quat(basis[..., :3, :3])
+
+    return (locations, quaternions)
@@ -0,0 +1,150 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Import statistics: wall time, peak memory and item counts of named phases (no bpy here).
+
+  stats = class_import_stats()
+  pskimport(filepath, ..., stats = stats)
+  stats.spans                 # list of dicts, see class_import_stats
+  stats.write_json(path)      # same as dict
+  stats.write_chrome_trace(path)  # chrome://tracing, ui.perfetto.dev
+'''
+
+import sys
+import time
+import json
+
+try:
+    import resource
+except ImportError:
+    # windows
+    resource = None
+
+def util_peak_rss():
+    '''peak resident set size of process in bytes, None if unknown'''
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on linux, bytes on macOS
+        if sys.platform == 'darwin':
+            return peak_rss
+        return peak_rss * 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb',                          wintypes.DWORD),
+                        ('PageFaultCount',              wintypes.DWORD),
+                        ('PeakWorkingSetSize',          ctypes.c_size_t),
+                        ('WorkingSetSize',              ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage',     ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage',         ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage',  ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage',      ctypes.c_size_t),
+                        ('PagefileUsage',               ctypes.c_size_t),
+                        ('PeakPagefileUsage',           ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                    ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+class class_import_stats:
+    '''Named phase spans of import.
+    Spans are in begin order: {'name', 'depth', 'start', 'seconds', 'count', 'peak_rss', 'detail'}
+    start is seconds from stats creation, count is number of processed items,
+    peak_rss is peak memory of process (bytes) at span end, detail is optional string.'''
+
+    def __init__(self):
+        self.time_start = time.perf_counter()
+        self.spans = []
+        self.open_spans = []
+        self.filepath = None
+
+    def begin(self, name, count = 0, detail = None):
+        span = {'name': name,
+                'depth': len(self.open_spans),
+                'start': time.perf_counter() - self.time_start,
+                'seconds': 0.0,
+                'count': count,
+                'peak_rss': None,
+                'detail': detail}
+        self.spans.append(span)
+        self.open_spans.append(span)
+        return span
+
+    def end(self, count = None):
+        '''end last begun span'''
+        span = self.open_spans.pop()
+        span['seconds'] = time.perf_counter() - self.time_start - span['start']
+        span['peak_rss'] = util_peak_rss()
+        if count is not None:
+            span['count'] = count
+        return span
+
+    def end_all(self):
+        '''end spans left open (by error or early return)'''
+        while self.open_spans:
+            self.end()
+
+    def total_seconds(self):
+        return sum(span['seconds'] for span in self.spans if span['depth'] == 0)
+
+    def peak_rss(self):
+        peaks = [span['peak_rss'] for span in self.spans if span['peak_rss'] is not None]
+        return max(peaks) if peaks else None
+
+    def as_dict(self):
+        return {'filepath': self.filepath,
+                'seconds': self.total_seconds(),
+                'peak_rss': self.peak_rss(),
+                'spans': self.spans}
+
+    def write_json(self, path):
+        with open(path, 'w') as json_file:
+            json.dump(self.as_dict(), json_file, indent = 1)
+
+    def write_chrome_trace(self, path):
+        '''Trace Event Format: complete events, microseconds'''
+        events = []
+        for span in self.spans:
+            args = {'count': span['count'], 'peak_rss': span['peak_rss']}
+            if span['detail'] is not None:
+                args['detail'] = span['detail']
+            events.append({'name': span['name'],
+                           'cat': 'import',
+                           'ph': 'X',
+                           'ts': span['start'] * 1e6,
+                           'dur': span['seconds'] * 1e6,
+                           'pid': 1,
+                           'tid': 1,
+                           'args': args})
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    def print_summary(self):
+        for span in self.spans:
+            if span['peak_rss'] is None:
+                peak_rss = ''
+            else:
+                peak_rss = '%.1f' % (span['peak_rss'] / (1024 * 1024))
+            print("{0:>9.3f}s {1:>9}MB {2}{3} {4} {5}".format(
+                span['seconds'], peak_rss, '  ' * span['depth'], span['name'],
+                span['count'] if span['count'] else '',
+                span['detail'] if span['detail'] is not None else ''))
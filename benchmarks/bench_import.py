@@ -0,0 +1,258 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Import benchmark on synthetic psk/psa files of scaled sizes.
+
+  python benchmarks/bench_import.py [options]
+      parsing only (header, chunks, psa index and keys)
+  blender -b --factory-startup --python benchmarks/bench_import.py -- [options]
+      parsing and import to blender (bones, armature, mesh, uv, weights, keyframes)
+
+Writes JSON report with wall time, peak memory and item count of every phase,
+reports of two runs can be compared with --compare.
+'''
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'addons')
+# pskpsa and stats do not need blender
+sys.path.insert(0, os.path.join(ADDON_DIR, 'io_import_scene_unreal_psa_psk'))
+sys.path.insert(0, BENCH_DIR)
+
+import pskpsa
+from stats import class_import_stats
+from synthetic import synthetic_psk, synthetic_psa
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+BENCH_REPORT_FORMAT = 1
+
+# psk: points, faces, bones (4 influences per point); psa: bones, actions, frames
+# max error of psa import with reduced keys (default of import option)
+BENCH_REDUCE_KEYS_ERROR = 0.001
+
+BENCH_SIZES = {
+    'small':  {'points':   5000, 'faces':  10000, 'bones':  50, 'actions':  10, 'frames':  60},
+    'medium': {'points':  50000, 'faces': 100000, 'bones': 150, 'actions':  50, 'frames': 120},
+    'large':  {'points': 300000, 'faces': 600000, 'bones': 300, 'actions': 100, 'frames': 300},
+}
+
+def bench_phases(stats_list):
+    '''phases of best run: spans with same name (per action, per chunk...) are summed'''
+    best = min(stats_list, key = lambda stats: stats.total_seconds())
+    phases = []
+    by_name = {}
+    for span in best.spans:
+        phase = by_name.get(span['name'])
+        if phase is None:
+            phase = {'name': span['name'], 'depth': span['depth'], 'seconds': 0.0, 'count': 0, 'calls': 0,
+                     'peak_rss': None}
+            by_name[span['name']] = phase
+            phases.append(phase)
+        phase['seconds'] += span['seconds']
+        phase['count'] += span['count']
+        phase['calls'] += 1
+        if span['peak_rss'] is not None:
+            phase['peak_rss'] = max(phase['peak_rss'] or 0, span['peak_rss'])
+    return phases
+
+def bench_case(case, size, params, filepath, repeat, run):
+    '''run(stats) repeat times. Returns result of case for report.'''
+    stats_list = []
+    runs = []
+    for i in range(repeat):
+        stats = class_import_stats()
+        time_start = time.perf_counter()
+        if run(stats) is False:
+            raise RuntimeError("%s failed: %s" % (case, filepath))
+        runs.append(time.perf_counter() - time_start)
+        stats_list.append(stats)
+    result = {
+        'case': case,
+        'size': size,
+        'params': params,
+        'file_bytes': os.path.getsize(filepath),
+        'seconds': min(runs),
+        'runs': runs,
+        'peak_rss': max(stats.peak_rss() or 0 for stats in stats_list) or None,
+        'phases': bench_phases(stats_list),
+    }
+    print("{0:>9.3f}s  {1:<12} {2}".format(result['seconds'], case, size))
+    for phase in result['phases']:
+        print("{0:>9.3f}s  {1}{2} {3}".format(
+            phase['seconds'], '  ' * (phase['depth'] + 1), phase['name'], phase['count'] or ''))
+    return result
+
+def bench_psa_import_reduced(addon, filepath, stats):
+    '''psa import with reduced keys, checks that kept keys got linear interpolation'''
+    actions_before = set(bpy.data.actions)
+    if addon.psaimport(filepath, bpy.context, stats = stats, reduce_keys_error = BENCH_REDUCE_KEYS_ERROR) is False:
+        return False
+    for action in set(bpy.data.actions) - actions_before:
+        for fcurve in action.fcurves:
+            if any(keyframe.interpolation != 'LINEAR' for keyframe in fcurve.keyframe_points):
+                raise RuntimeError("Key of reduced action is not linear: %s %s" % (action.name, fcurve.data_path))
+    return True
+
+def bench_psk_parse(filepath, stats):
+    stats.begin('read')
+    pskpsa.psk_read(filepath, stats)
+    stats.end()
+
+def bench_psa_parse(filepath, stats):
+    stats.begin('read')
+    psa_reader = pskpsa.class_psa_reader(filepath)
+    stats.end(len(psa_reader.chunks))
+    # keys as importer gets them
+    stats.begin('keys', int(psa_reader.chunks_by_name['ANIMKEYS'][3]))
+    for action_index in range(len(psa_reader.actions)):
+        action_keys = psa_reader.action_keys(action_index)
+        action_keys['pos'].astype(np.float64)
+        action_keys['quat'][..., (3, 0, 1, 2)].astype(np.float64)
+    del action_keys
+    stats.end()
+    psa_reader.close()
+
+def bench_blend_clear():
+    '''empty scene and remove data of previous import'''
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        scene.objects.unlink(obj)
+        bpy.data.objects.remove(obj)
+    for collection in (bpy.data.meshes, bpy.data.armatures, bpy.data.actions, bpy.data.materials):
+        for data in list(collection):
+            if data.users == 0:
+                collection.remove(data)
+
+def bench_main(argv):
+    parser = argparse.ArgumentParser(
+        prog = 'bench_import.py' if bpy is None else 'blender -b --python bench_import.py --',
+        description = 'Benchmark psk/psa import on synthetic files.')
+    parser.add_argument('-s', '--sizes', default = 'small,medium',
+                        help = 'comma separated: ' + ', '.join(sorted(BENCH_SIZES)))
+    parser.add_argument('-r', '--repeat', type = int, default = 3, help = 'runs per case, best is reported')
+    parser.add_argument('-o', '--output', default = 'bench_report.json', help = 'JSON report path')
+    parser.add_argument('--compare', metavar = 'REPORT', help = 'print ratio to previous JSON report')
+    parser.add_argument('--keep', metavar = 'DIR', help = 'write synthetic files to DIR and keep them')
+    args = parser.parse_args(argv)
+    
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    for size in sizes:
+        if size not in BENCH_SIZES:
+            parser.error('unknown size: ' + size)
+    
+    if bpy is not None:
+        sys.path.insert(0, ADDON_DIR)
+        import io_import_scene_unreal_psa_psk as addon
+        if not hasattr(bpy.types.Scene, 'psk_import'):
+            addon.register()
+    
+    data_dir = args.keep or tempfile.mkdtemp(prefix = 'pskpsa_bench_')
+    os.makedirs(data_dir, exist_ok = True)
+    
+    results = []
+    try:
+        for size in sizes:
+            params = BENCH_SIZES[size]
+            psk_path = os.path.join(data_dir, size + '.psk')
+            psa_path = os.path.join(data_dir, size + '.psa')
+            if not os.path.exists(psk_path):
+                synthetic_psk(psk_path, params['points'], params['faces'], params['bones'])
+            if not os.path.exists(psa_path):
+                synthetic_psa(psa_path, params['bones'], params['actions'], params['frames'])
+            
+            results.append(bench_case('psk parse', size, params, psk_path, args.repeat,
+                                      lambda stats: bench_psk_parse(psk_path, stats)))
+            results.append(bench_case('psa parse', size, params, psa_path, args.repeat,
+                                      lambda stats: bench_psa_parse(psa_path, stats)))
+            if bpy is None:
+                continue
+            
+            # psa is imported to armature of psk, both are imported on every run
+            def run_psk_import(stats):
+                bench_blend_clear()
+                return addon.pskimport(psk_path, True, True, False, True, stats)
+            results.append(bench_case('psk import', size, params, psk_path, args.repeat, run_psk_import))
+            results.append(bench_case('psa import', size, params, psa_path, args.repeat,
+                                      lambda stats: addon.psaimport(psa_path, bpy.context, stats = stats)))
+            results.append(bench_case('psa import reduced', size, params, psa_path, args.repeat,
+                                      lambda stats: bench_psa_import_reduced(addon, psa_path, stats)))
+            bench_blend_clear()
+    finally:
+        if not args.keep:
+            shutil.rmtree(data_dir, ignore_errors = True)
+    
+    report = {
+        'format': BENCH_REPORT_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'blender': bpy.app.version_string if bpy is not None else None,
+        },
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w') as report_file:
+        json.dump(report, report_file, indent = 1)
+    print("Report:", os.path.abspath(args.output))
+    
+    if args.compare:
+        bench_compare(args.compare, report)
+
+def bench_compare(old_path, report):
+    '''print old and new seconds of every case and phase'''
+    with open(old_path) as old_file:
+        old_report = json.load(old_file)
+    old_results = {(result['case'], result['size']): result for result in old_report['results']}
+    print("--------------------------------------------------")
+    print("{0:>9} {1:>9} {2:>7}  compared to {3}".format('old', 'new', 'speedup', old_path))
+    for result in report['results']:
+        old_result = old_results.get((result['case'], result['size']))
+        if old_result is None:
+            continue
+        old_phases = {phase['name']: phase for phase in old_result['phases']}
+        rows = [(result['case'] + ' ' + result['size'], old_result['seconds'], result['seconds'])]
+        rows += [('  ' * (phase['depth'] + 1) + phase['name'], old_phases[phase['name']]['seconds'], phase['seconds'])
+                 for phase in result['phases'] if phase['name'] in old_phases]
+        for (name, old_seconds, seconds) in rows:
+            print("{0:>8.3f}s {1:>8.3f}s {2:>6.2f}x  {3}".format(
+                old_seconds, seconds, old_seconds / max(seconds, 1e-9), name))
+
+if __name__ == "__main__":
+    if bpy is not None:
+        # blender arguments end with '--'
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    else:
+        argv = sys.argv[1:]
+    bench_main(argv)
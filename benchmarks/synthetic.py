@@ -0,0 +1,158 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Synthetic psk/psa files of given size (numpy only, no bpy).
+
+Records are built with dtypes of pskpsa field tables, so files match
+what importer reads. Content is random but valid: bones form a tree
+(parents first), faces use existing wedges, influences use existing bones.
+'''
+
+import numpy as np
+from struct import pack
+
+from pskpsa import (util_chunk_dtype,
+                    PSK_VPOINT_FIELDS,
+                    PSK_VVERTEX_FIELDS,
+                    PSK_VTRIANGLE_FIELDS,
+                    PSK_VMATERIAL_FIELDS,
+                    PSKPSA_VBONE_FIELDS,
+                    PSK_VRAWBONEINFLUENCE_FIELDS,
+                    PSA_ANIMINFO_FIELDS,
+                    PSA_VQUATANIMKEY_FIELDS)
+
+# VChunkHeader.DataSize of records written by UModel
+PSK_VPOINT_SIZE = 12
+PSK_VVERTEX_SIZE = 16
+PSK_VTRIANGLE_SIZE = 12
+PSK_VMATERIAL_SIZE = 88
+PSKPSA_VBONE_SIZE = 120
+PSK_VRAWBONEINFLUENCE_SIZE = 12
+PSA_ANIMINFO_SIZE = 168
+PSA_VQUATANIMKEY_SIZE = 32
+
+# FACE0000 stores wedge indexes as uint16
+PSK_MAX_WEDGES = 65536
+
+def synthetic_chunk(chunk_id, datasize, records = None):
+    '''VChunkHeader + data'''
+    if records is None:
+        return pack('20s3i', chunk_id, 0, datasize, 0)
+    return pack('20s3i', chunk_id, 0, datasize, len(records)) + records.tobytes()
+
+def synthetic_records(fields, datasize, count):
+    return np.zeros(count, dtype = util_chunk_dtype(fields, datasize))
+
+def synthetic_quats(rng, count):
+    '''random unit quaternions (x, y, z, w)'''
+    quats = rng.standard_normal((count, 4))
+    quats /= np.linalg.norm(quats, axis = 1)[:, np.newaxis]
+    return quats
+
+def synthetic_bones(rng, count):
+    '''VBone records: tree with parents first, root is bone 0 (parent 0)'''
+    bones = synthetic_records(PSKPSA_VBONE_FIELDS, PSKPSA_VBONE_SIZE, count)
+    bones['name'] = [b'bone_%04i' % i for i in range(count)]
+    parents = np.zeros(count, dtype = np.int32)
+    if count > 1:
+        # parent is one of previous bones, mostly close ones (long chains, like limbs)
+        parents[1:] = np.maximum(0, np.arange(1, count) - rng.geometric(0.5, count - 1))
+    bones['parent_index'] = parents
+    bones['num_children'] = np.bincount(parents[1:], minlength = count)
+    bones['quat'] = synthetic_quats(rng, count)
+    bones['pos'] = rng.uniform(-10.0, 10.0, (count, 3))
+    bones['size'] = 1.0
+    return bones
+
+def synthetic_psk(filepath, points, faces, bones, influences = 4, materials = 1, seed = 0):
+    '''write psk with given counts. influences: per point.
+    Wedge count is min(points, 65536); wedges are spread over all points.'''
+    rng = np.random.RandomState(seed)
+    wedge_count = min(points, PSK_MAX_WEDGES)
+    
+    pnts = synthetic_records(PSK_VPOINT_FIELDS, PSK_VPOINT_SIZE, points)
+    pnts['co'] = rng.uniform(-100.0, 100.0, (points, 3))
+    
+    wedges = synthetic_records(PSK_VVERTEX_FIELDS, PSK_VVERTEX_SIZE, wedge_count)
+    wedges['point_index'] = np.linspace(0, points - 1, wedge_count).astype(np.uint32)
+    wedges['u'] = rng.uniform(0.0, 1.0, wedge_count)
+    wedges['v'] = rng.uniform(0.0, 1.0, wedge_count)
+    wedges['mat_index'] = rng.randint(0, materials, wedge_count)
+    
+    tris = synthetic_records(PSK_VTRIANGLE_FIELDS, PSK_VTRIANGLE_SIZE, faces)
+    # three different wedges per face
+    first = rng.randint(0, wedge_count, faces)
+    tris['wedge_index'] = (first[:, np.newaxis] + np.arange(3)) % wedge_count
+    tris['mat_index'] = wedges['mat_index'][first]
+    tris['smoothing_groups'] = 1
+    
+    mats = synthetic_records(PSK_VMATERIAL_FIELDS, PSK_VMATERIAL_SIZE, materials)
+    mats['name'] = [b'material_%02i' % i for i in range(materials)]
+    
+    refskel = synthetic_bones(rng, bones)
+    
+    raww = synthetic_records(PSK_VRAWBONEINFLUENCE_FIELDS, PSK_VRAWBONEINFLUENCE_SIZE, points * influences)
+    weights = rng.uniform(0.1, 1.0, (points, influences))
+    # weights as exported: few distinct values
+    weights = np.round(weights / weights.sum(axis = 1)[:, np.newaxis], 2)
+    raww['weight'] = weights.ravel()
+    raww['point_index'] = np.repeat(np.arange(points), influences)
+    raww['bone_index'] = rng.randint(0, bones, points * influences)
+    
+    with open(filepath, 'wb') as pskfile:
+        pskfile.write(synthetic_chunk(b'ACTRHEAD', 0))
+        pskfile.write(synthetic_chunk(b'PNTS0000', PSK_VPOINT_SIZE, pnts))
+        pskfile.write(synthetic_chunk(b'VTXW0000', PSK_VVERTEX_SIZE, wedges))
+        pskfile.write(synthetic_chunk(b'FACE0000', PSK_VTRIANGLE_SIZE, tris))
+        pskfile.write(synthetic_chunk(b'MATT0000', PSK_VMATERIAL_SIZE, mats))
+        pskfile.write(synthetic_chunk(b'REFSKEL0', PSKPSA_VBONE_SIZE, refskel))
+        pskfile.write(synthetic_chunk(b'RAWW0000', PSK_VRAWBONEINFLUENCE_SIZE, raww))
+
+def synthetic_psa(filepath, bones, actions, frames, seed = 0):
+    '''write psa with given counts. Bones have same names as bones of synthetic_psk().'''
+    rng = np.random.RandomState(seed)
+    
+    bonenames = synthetic_bones(rng, bones)
+    
+    infos = synthetic_records(PSA_ANIMINFO_FIELDS, PSA_ANIMINFO_SIZE, actions)
+    infos['name'] = [b'action_%04i' % i for i in range(actions)]
+    infos['group'] = b'None'
+    infos['total_bones'] = bones
+    infos['track_time'] = frames
+    infos['anim_rate'] = 30.0
+    infos['first_raw_frame'] = np.arange(actions) * frames
+    infos['num_raw_frames'] = frames
+    
+    with open(filepath, 'wb') as psafile:
+        psafile.write(synthetic_chunk(b'ANIMHEAD', 0))
+        psafile.write(synthetic_chunk(b'BONENAMES', PSKPSA_VBONE_SIZE, bonenames))
+        psafile.write(synthetic_chunk(b'ANIMINFO', PSA_ANIMINFO_SIZE, infos))
+        # keys are written per action, big files are not built in memory at once
+        psafile.write(pack('20s3i', b'ANIMKEYS', 0, PSA_VQUATANIMKEY_SIZE, actions * frames * bones))
+        for action_index in range(actions):
+            keys = synthetic_records(PSA_VQUATANIMKEY_FIELDS, PSA_VQUATANIMKEY_SIZE, frames * bones)
+            # bones moving smoothly around rest pose
+            phase = np.linspace(0.0, np.pi, frames)[:, np.newaxis, np.newaxis]
+            offsets = rng.uniform(-0.2, 0.2, (1, bones, 4)) * np.sin(phase)
+            quats = bonenames['quat'][np.newaxis] + offsets
+            quats /= np.linalg.norm(quats, axis = 2)[..., np.newaxis]
+            keys['quat'] = quats.reshape(-1, 4)
+            keys['pos'] = np.tile(bonenames['pos'], (frames, 1))
+            keys['time'] = 1.0
+            psafile.write(keys.tobytes())
@@ -0,0 +1,44 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+Tests of the bpy-free modules of the addon (run with: python -m pytest tests).
+
+The addon package __init__ needs bpy, so the package is registered here by its
+path only and its modules (skeleton, animkeys, pskpsa, cache...) are imported
+without running __init__. Test files are written by benchmarks/synthetic.py.
+'''
+
+import os
+import sys
+import types
+
+ADDON_NAME = 'io_import_scene_unreal_psa_psk'
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_DIR = os.path.join(ROOT_DIR, 'addons', ADDON_NAME)
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+
+if ADDON_NAME not in sys.modules:
+    addon_package = types.ModuleType(ADDON_NAME)
+    addon_package.__path__ = [ADDON_DIR]
+    sys.modules[ADDON_NAME] = addon_package
+
+# synthetic.py imports pskpsa as top level module (as bench_import.py does)
+for path in (ADDON_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,96 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+animkeys: quaternion continuity, key frames of actions, key reduction.
+'''
+
+import numpy as np
+
+from io_import_scene_unreal_psa_psk.animkeys import util_quat_continuity, util_psa_key_frames, util_keys_reduce
+
+def interpolate_kept(values, keep, key_frames):
+    '''curves rebuilt by linear interpolation between kept keys'''
+    return np.array([np.interp(key_frames, key_frames[curve_keep], curve_values[curve_keep])
+                     for (curve_values, curve_keep) in zip(values, keep)])
+
+def test_quat_continuity():
+    rng = np.random.RandomState(0)
+    quats = rng.normal(size = (20, 3, 4))
+    quats /= np.linalg.norm(quats, axis = -1)[..., np.newaxis]
+    # smooth curves, then random signs (same rotations)
+    quats = np.cumsum(quats * 0.1, axis = 0) + quats[:1]
+    quats /= np.linalg.norm(quats, axis = -1)[..., np.newaxis]
+    flipped = quats * rng.choice((-1.0, 1.0), size = (20, 3, 1))
+    flipped[0] = quats[0]
+    result = util_quat_continuity(flipped)
+    # in place
+    assert result is flipped
+    np.testing.assert_allclose(result, quats)
+    assert (np.sum(result[1:] * result[:-1], axis = -1) >= 0.0).all()
+
+def test_quat_continuity_short():
+    quats = np.array([[0.0, 1.0, 0.0, 0.0]])
+    np.testing.assert_array_equal(util_quat_continuity(quats.copy()), quats)
+    assert util_quat_continuity(np.zeros((0, 4))).shape == (0, 4)
+
+def test_key_frames():
+    # time of key is duration until next key, time of last key is not used
+    np.testing.assert_allclose(util_psa_key_frames([1.0, 2.0, 0.5, 7.0]), [0.0, 1.0, 3.0, 3.5])
+    # scene fps / AnimRate
+    np.testing.assert_allclose(util_psa_key_frames([1.0, 2.0, 0.5], frame_scale = 0.8), [0.0, 0.8, 2.4])
+    assert len(util_psa_key_frames([])) == 0
+    np.testing.assert_allclose(util_psa_key_frames([5.0]), [0.0])
+
+def test_key_frames_invalid_times():
+    # keys are evenly placed over TrackTime, by KeyReduction or one frame apart
+    np.testing.assert_allclose(util_psa_key_frames([0.0, 0.0, 0.0, 0.0], track_time = 8.0), [0.0, 2.0, 4.0, 6.0])
+    np.testing.assert_allclose(util_psa_key_frames([1.0, -1.0, 1.0], key_reduction = 0.5), [0.0, 2.0, 4.0])
+    np.testing.assert_allclose(util_psa_key_frames([1.0, np.nan, 1.0], frame_scale = 2.0), [0.0, 2.0, 4.0])
+
+def test_keys_reduce_line():
+    # linear in frames (not in key index): only first and last key are needed
+    key_frames = np.array([0.0, 1.0, 3.0, 4.0, 8.0, 9.0])
+    values = np.stack((key_frames * 2.0 + 1.0, np.full(6, 3.0)))
+    keep = util_keys_reduce(values, 1e-6, key_frames)
+    assert keep.tolist() == [[True, False, False, False, False, True]] * 2
+    # by key index, same curve is not a line
+    assert util_keys_reduce(values[:1], 1e-6)[0, 1:-1].any()
+
+def test_keys_reduce_error():
+    rng = np.random.RandomState(0)
+    values = np.cumsum(rng.normal(size = (5, 200)), axis = 1)
+    key_frames = np.cumsum(rng.uniform(0.5, 2.0, 200))
+    for max_error in (0.0, 0.1, 1.0, 5.0):
+        keep = util_keys_reduce(values, max_error, key_frames)
+        assert keep[:, 0].all() and keep[:, -1].all()
+        error = np.abs(interpolate_kept(values, keep, key_frames) - values).max()
+        assert error <= max_error + 1e-9
+    # larger error keeps less keys
+    assert util_keys_reduce(values, 5.0, key_frames).sum() < util_keys_reduce(values, 0.1, key_frames).sum()
+
+def test_keys_reduce_spike():
+    values = np.zeros((1, 9))
+    values[0, 4] = 1.0
+    assert np.flatnonzero(util_keys_reduce(values, 0.5)[0]).tolist() == [0, 3, 4, 5, 8]
+    assert np.flatnonzero(util_keys_reduce(values, 2.0)[0]).tolist() == [0, 8]
+
+def test_keys_reduce_short():
+    assert util_keys_reduce(np.zeros((2, 0)), 0.1).shape == (2, 0)
+    assert util_keys_reduce(np.zeros((2, 1)), 0.1).all()
+    assert util_keys_reduce(np.ones((2, 2)), 0.1).all()
@@ -0,0 +1,90 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+class_parse_cache: miss, hit, broken entries.
+'''
+
+import os
+
+import numpy as np
+import pytest
+
+from io_import_scene_unreal_psa_psk.cache import class_parse_cache
+
+@pytest.fixture
+def parse_cache(tmpdir):
+    return class_parse_cache(str(tmpdir.join('cache')))
+
+@pytest.fixture
+def source_path(tmpdir):
+    filepath = str(tmpdir.join('source.psk'))
+    with open(filepath, 'wb') as source_file:
+        source_file.write(b'source file content')
+    return filepath
+
+def test_cache_miss_and_hit(parse_cache, source_path):
+    assert parse_cache.load(source_path) is None
+    arrays = {'points': np.arange(12, dtype = np.float32).reshape(4, 3),
+              'names': np.array([b'root', b'spine'], dtype = 'S64')}
+    parse_cache.store(source_path, arrays)
+    loaded = parse_cache.load(source_path)
+    assert sorted(loaded) == ['names', 'points']
+    for name in arrays:
+        np.testing.assert_array_equal(loaded[name], arrays[name])
+        assert loaded[name].dtype == arrays[name].dtype
+    assert (parse_cache.hits, parse_cache.misses) == (1, 1)
+
+def test_cache_arrays_are_mapped_on_use(parse_cache, source_path):
+    parse_cache.store(source_path, {'points': np.arange(30, dtype = np.float32),
+                                    'empty': np.zeros(0, dtype = np.float32)})
+    loaded = parse_cache.load(source_path)
+    assert not loaded.arrays
+    points = loaded['points']
+    assert isinstance(points, np.memmap) and not points.flags.writeable
+    assert list(loaded.arrays) == ['points']
+    assert len(loaded['empty']) == 0
+
+def test_cache_changed_file_is_miss(parse_cache, source_path):
+    parse_cache.store(source_path, {'points': np.zeros(3)})
+    with open(source_path, 'ab') as source_file:
+        source_file.write(b' changed')
+    assert parse_cache.load(source_path) is None
+
+def entry_files(parse_cache, source_path):
+    entry_path = parse_cache.entry_path(parse_cache.file_hash(source_path))
+    return [os.path.join(entry_path, name) for name in sorted(os.listdir(entry_path))]
+
+@pytest.mark.parametrize('damage', ['truncate', 'overwrite'])
+def test_cache_broken_entry(parse_cache, source_path, damage):
+    parse_cache.store(source_path, {'points': np.arange(3000, dtype = np.float32)})
+    for entry_file_path in entry_files(parse_cache, source_path):
+        with open(entry_file_path, 'rb') as entry_file:
+            data = bytearray(entry_file.read())
+        if damage == 'truncate':
+            data = data[:len(data) // 2]
+        else:
+            data[40:400] = b'\xff' * 360
+        with open(entry_file_path, 'wb') as entry_file:
+            entry_file.write(bytes(data))
+    assert parse_cache.load(source_path) is None
+    assert parse_cache.misses == 1
+    # broken entry is removed, file is stored again
+    assert not os.path.exists(parse_cache.entry_path(parse_cache.file_hash(source_path)))
+    parse_cache.store(source_path, {'points': np.arange(3000, dtype = np.float32)})
+    assert parse_cache.load(source_path)['points'][-1] == 2999
@@ -0,0 +1,243 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+psk_read() and class_psa_reader on synthetic files, including broken ones.
+'''
+
+import os
+from struct import pack
+
+import numpy as np
+import pytest
+
+from io_import_scene_unreal_psa_psk.pskpsa import psk_read, class_psa_reader, util_psa_scan_actions, util_bytes_to_str
+from io_import_scene_unreal_psa_psk.cache import class_parse_cache
+
+from synthetic import synthetic_psk, synthetic_psa
+
+PSA_BONES = 5
+PSA_ACTIONS = 3
+PSA_FRAMES = 4
+
+@pytest.fixture
+def psa_path(tmpdir):
+    filepath = str(tmpdir.join('test.psa'))
+    synthetic_psa(filepath, PSA_BONES, PSA_ACTIONS, PSA_FRAMES)
+    return filepath
+
+@pytest.fixture
+def psk_path(tmpdir):
+    filepath = str(tmpdir.join('test.psk'))
+    synthetic_psk(filepath, 40, 30, 6)
+    return filepath
+
+def truncated_copy(filepath, size):
+    with open(filepath, 'rb') as src_file:
+        data = src_file.read(size)
+    truncated_path = filepath + '.truncated'
+    with open(truncated_path, 'wb') as dst_file:
+        dst_file.write(data)
+    return truncated_path
+
+def open_files_count():
+    if not os.path.isdir('/proc/self/fd'):
+        pytest.skip('open files are counted on linux only')
+    return len(os.listdir('/proc/self/fd'))
+
+def chunk_data_offset(filepath, chunk_name):
+    psa_reader = class_psa_reader(filepath)
+    offset = psa_reader.chunks_by_name[chunk_name][4]
+    psa_reader.close()
+    return offset
+
+def chunk_bytes_range(psk, chunk_name):
+    '''(start, end) of header and data of psk chunk in file'''
+    (chunk_id, type_flag, datasize, datacount, data_offset) = psk.chunks_by_name[chunk_name]
+    return (data_offset - 32, data_offset + datasize * datacount)
+
+def test_psk_read(psk_path):
+    psk = psk_read(psk_path)
+    assert [chunk[0].rstrip(b'\0') for chunk in psk.chunks] == [
+            b'ACTRHEAD', b'PNTS0000', b'VTXW0000', b'FACE0000', b'MATT0000', b'REFSKEL0', b'RAWW0000']
+    assert (len(psk.points), len(psk.wedges), len(psk.faces), len(psk.bones), len(psk.influences)) == (40, 40, 30, 6, 160)
+    assert psk.bones['name'].tolist() == [b'bone_%04i' % index for index in range(6)]
+    assert psk.faces['wedge_index'].max() < len(psk.wedges)
+    # chunks, that are not in file, are empty
+    assert len(psk.normals) == 0 and len(psk.morph_infos) == 0 and psk.extra_uvs == []
+
+def test_psk_read_chunk_order(psk_path):
+    psk = psk_read(psk_path)
+    with open(psk_path, 'rb') as pskfile:
+        data = pskfile.read()
+    # header first, other chunks reversed, unknown chunk in between
+    ranges = [chunk_bytes_range(psk, util_bytes_to_str(chunk[0])) for chunk in psk.chunks]
+    unknown = pack('20s3i', b'UNKNOWN0', 0, 4, 2) + b'\xff' * 8
+    reordered = data[slice(*ranges[0])] + unknown + b''.join(data[slice(*byte_range)] for byte_range in ranges[:0:-1])
+    reordered_path = psk_path + '.reordered'
+    with open(reordered_path, 'wb') as pskfile:
+        pskfile.write(reordered)
+    reordered_psk = psk_read(reordered_path)
+    assert 'UNKNOWN0' in reordered_psk.chunks_by_name
+    for name in ('points', 'wedges', 'faces', 'materials', 'bones', 'influences'):
+        np.testing.assert_array_equal(getattr(reordered_psk, name), getattr(psk, name))
+
+def test_psk_read_truncated(psk_path):
+    psk = psk_read(psk_path)
+    (faces_start, faces_end) = chunk_bytes_range(psk, 'FACE0000')
+    # cut in data of chunk
+    with pytest.raises(ValueError) as error:
+        psk_read(truncated_copy(psk_path, faces_end - 5))
+    assert 'Unexpected end of file' in str(error.value)
+    # cut in header of chunk: file ends before chunk, faces are missing
+    with pytest.raises(ValueError) as error:
+        psk_read(truncated_copy(psk_path, faces_start + 10))
+    assert 'Chunk not found: faces' in str(error.value)
+
+def test_psk_read_truncated_skeleton_only(psk_path):
+    psk = psk_read(psk_path)
+    # payload of skipped chunks is not read: cut influences do not matter for skeleton
+    skeleton_psk = psk_read(truncated_copy(psk_path, os.path.getsize(psk_path) - 5), mesh = False)
+    np.testing.assert_array_equal(skeleton_psk.bones, psk.bones)
+    assert skeleton_psk.points is None
+
+def test_psk_read_missing_chunk(psk_path):
+    psk = psk_read(psk_path)
+    with open(psk_path, 'rb') as pskfile:
+        data = pskfile.read()
+    (wedges_start, wedges_end) = chunk_bytes_range(psk, 'VTXW0000')
+    missing_path = psk_path + '.missing'
+    with open(missing_path, 'wb') as pskfile:
+        pskfile.write(data[:wedges_start] + data[wedges_end:])
+    with pytest.raises(ValueError) as error:
+        psk_read(missing_path)
+    assert 'Chunk not found: wedges' in str(error.value)
+    # skeleton does not need wedges
+    assert len(psk_read(missing_path, mesh = False).bones) == 6
+
+def test_psk_read_not_psk(psa_path, tmpdir):
+    with pytest.raises(ValueError) as error:
+        psk_read(psa_path)
+    assert 'header' in str(error.value)
+    empty_path = str(tmpdir.join('empty.psk'))
+    open(empty_path, 'wb').close()
+    with pytest.raises(ValueError):
+        psk_read(empty_path)
+
+def test_psa_reader(psa_path):
+    psa_reader = class_psa_reader(psa_path)
+    try:
+        assert [chunk[0].rstrip(b'\0') for chunk in psa_reader.chunks] == [
+                b'ANIMHEAD', b'BONENAMES', b'ANIMINFO', b'ANIMKEYS']
+        assert len(psa_reader.bones) == PSA_BONES
+        assert len(psa_reader.actions) == PSA_ACTIONS
+        assert psa_reader.actions_key_offset.tolist() == [0, PSA_FRAMES * PSA_BONES, 2 * PSA_FRAMES * PSA_BONES]
+        keys = psa_reader.action_keys(2)
+        assert keys.shape == (PSA_FRAMES, PSA_BONES)
+        np.testing.assert_allclose(np.linalg.norm(keys['quat'], axis = -1), 1.0, rtol = 1e-6)
+        del keys
+    finally:
+        psa_reader.close()
+
+def test_psa_reader_truncated_animinfo(psa_path):
+    truncated_path = truncated_copy(psa_path, chunk_data_offset(psa_path, 'ANIMINFO') + 100)
+    files_open = open_files_count()
+    with pytest.raises(ValueError) as error:
+        class_psa_reader(truncated_path)
+    assert 'Broken psa file' in str(error.value)
+    # file (and its map) is closed
+    assert open_files_count() == files_open
+
+def test_psa_reader_truncated_keys(psa_path):
+    # actions index is complete, keys of last action are cut: file is rejected on open
+    truncated_path = truncated_copy(psa_path, os.path.getsize(psa_path) - 10)
+    files_open = open_files_count()
+    with pytest.raises(ValueError) as error:
+        class_psa_reader(truncated_path)
+    assert 'Broken psa file' in str(error.value) and 'ANIMKEYS' in str(error.value)
+    assert open_files_count() == files_open
+    assert util_psa_scan_actions(truncated_path) is None
+
+def test_psa_reader_keys_range(psa_path):
+    psa_reader = class_psa_reader(psa_path)
+    try:
+        assert psa_reader.action_keys(PSA_ACTIONS - 1).shape == (PSA_FRAMES, PSA_BONES)
+        # action with more keys than ANIMKEYS has
+        psa_reader.actions = psa_reader.actions.copy()
+        psa_reader.actions['num_raw_frames'][-1] += 1
+        with pytest.raises(ValueError):
+            psa_reader.action_keys(PSA_ACTIONS - 1)
+    finally:
+        psa_reader.close()
+
+def test_psa_reader_not_psa(tmpdir):
+    psk_path = str(tmpdir.join('test.psk'))
+    synthetic_psk(psk_path, 10, 5, 3)
+    files_open = open_files_count()
+    with pytest.raises(ValueError) as error:
+        class_psa_reader(psk_path)
+    assert 'header' in str(error.value)
+    assert open_files_count() == files_open
+
+def test_psa_scan_actions(psa_path, tmpdir):
+    assert util_psa_scan_actions(psa_path) == [('action_%04i' % index, 'None', PSA_FRAMES, PSA_BONES)
+                                               for index in range(PSA_ACTIONS)]
+    # unreadable, broken and other files are not listed (no error is raised)
+    truncated_path = truncated_copy(psa_path, chunk_data_offset(psa_path, 'ANIMINFO') + 100)
+    assert util_psa_scan_actions(truncated_path) is None
+    assert util_psa_scan_actions(str(tmpdir.join('missing.psa'))) is None
+    empty_path = str(tmpdir.join('empty.psa'))
+    open(empty_path, 'wb').close()
+    assert util_psa_scan_actions(empty_path) is None
+    psk_path = str(tmpdir.join('test.psk'))
+    synthetic_psk(psk_path, 10, 5, 3)
+    assert util_psa_scan_actions(psk_path) is None
+
+def test_psk_read_cache(psk_path, tmpdir):
+    parse_cache = class_parse_cache(str(tmpdir.join('cache')))
+    psk = psk_read(psk_path, cache = parse_cache)
+    assert parse_cache.misses == 1
+    cached_psk = psk_read(psk_path, cache = parse_cache)
+    assert parse_cache.hits == 1
+    assert cached_psk.chunks == psk.chunks
+    for name in ('points', 'wedges', 'faces', 'materials', 'bones', 'influences'):
+        np.testing.assert_array_equal(getattr(cached_psk, name), getattr(psk, name))
+
+def test_psk_read_cache_skeleton_only(psk_path, tmpdir):
+    parse_cache = class_parse_cache(str(tmpdir.join('cache')))
+    psk_read(psk_path, cache = parse_cache)
+    loaded = []
+    load = parse_cache.load
+    parse_cache.load = lambda filepath, **kwargs: loaded.append(load(filepath, **kwargs)) or loaded[-1]
+    psk = psk_read(psk_path, cache = parse_cache, mesh = False)
+    assert len(psk.bones) == 6 and psk.points is None
+    # mesh arrays of entry are not mapped
+    assert sorted(loaded[0].arrays) == ['bones', 'chunks']
+
+def test_psk_read_cache_skeleton_only_cold(psk_path, tmpdir):
+    parse_cache = class_parse_cache(str(tmpdir.join('cache')))
+    hashed = []
+    file_hash = parse_cache.file_hash
+    parse_cache.file_hash = lambda filepath, hash_file = True: hashed.append(hash_file) or file_hash(filepath, hash_file)
+    # file is not hashed (not read beyond skeleton) and nothing is stored
+    psk = psk_read(psk_path, cache = parse_cache, mesh = False)
+    assert len(psk.bones) == 6
+    assert hashed == [False] and parse_cache.misses == 1
+    assert not os.path.exists(str(tmpdir.join('cache')))
+    assert psk_read(psk_path, cache = parse_cache, mesh = False).points is None
+    assert parse_cache.hits == 0
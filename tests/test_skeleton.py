@@ -0,0 +1,247 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''
+util_psa_solve_keys() against a per-bone, per-frame solver, written as the
+importer did it with mathutils: pose_bone.matrix set bone by bone, psa bone
+matrix of parent taken from psa_bone.Transform, which is pose_bone.matrix
+(evaluated pose) for bones without keys.
+'''
+
+import math
+
+import numpy as np
+
+from io_import_scene_unreal_psa_psk.skeleton import (class_skeleton, util_psa_solve_keys, util_quat_to_mat3,
+                                                     class_bone_name_index, util_psa_action_key_indexes,
+                                                     util_bone_roll_to_vectors)
+
+def quat_matrix(quat):
+    '''(w, x, y, z) -> 4x4 rotation'''
+    (w, x, y, z) = quat / np.linalg.norm(quat)
+    mat = np.identity(4)
+    mat[:3, :3] = ((1 - 2*(y*y + z*z), 2*(x*y - w*z),     2*(x*z + w*y)),
+                   (2*(x*y + w*z),     1 - 2*(x*x + z*z), 2*(y*z - w*x)),
+                   (2*(x*z - w*y),     2*(y*z + w*x),     1 - 2*(x*x + y*y)))
+    return mat
+
+def translation_matrix(loc):
+    mat = np.identity(4)
+    mat[:3, 3] = loc
+    return mat
+
+def rotation_part(mat):
+    '''Matrix.to_quaternion().to_matrix().to_4x4(): rotation of (orthogonalized) 3x3 part'''
+    (u, s, vt) = np.linalg.svd(mat[:3, :3])
+    rot = np.identity(4)
+    rot[:3, :3] = np.matmul(u, vt)
+    return rot
+
+def random_rigid(rng, count):
+    quats = rng.normal(size = (count, 4))
+    return np.array([np.matmul(translation_matrix(rng.normal(size = 3)), quat_matrix(quat)) for quat in quats])
+
+def reference_solve_keys(parent_indexes, key_indexes, matrix_rest, matrix_basis, matrix_fix, keys_pos, keys_quat):
+    '''(locations, rotation matrices) of pose bones, bone by bone (parents first)'''
+    (frames, bones_count) = (len(keys_pos), len(parent_indexes))
+    locations = np.zeros((frames, bones_count, 3))
+    rotations = np.zeros((frames, bones_count, 3, 3))
+    order = class_skeleton([str(index) for index in range(bones_count)], parent_indexes).order.tolist()
+    for frame in range(frames):
+        # psa_bone.Transform and pose_bone.matrix
+        transform = {}
+        pose = {}
+        for bone in order:
+            parent = parent_indexes[bone]
+            if parent < 0:
+                rest_offset = matrix_rest[bone]
+            else:
+                rest_offset = np.matmul(pose[parent], np.matmul(np.linalg.inv(matrix_rest[parent]), matrix_rest[bone]))
+            key = key_indexes[bone]
+            if key < 0:
+                # pose_bone.matrix after scene update, psa_bone.Transform is its live wrapper
+                pose[bone] = np.matmul(rest_offset, matrix_basis[bone])
+                transform[bone] = pose[bone]
+                continue
+            pos = keys_pos[frame, key]
+            quat = keys_quat[frame, key]
+            if parent >= 0:
+                quat_c = quat * (1.0, -1.0, -1.0, -1.0)
+                mat = np.matmul(transform[parent], np.matmul(translation_matrix(pos), quat_matrix(quat_c)))
+                mat_view = np.matmul(transform[parent], translation_matrix(pos))
+                rot = np.matmul(rotation_part(transform[parent]), quat_matrix(quat_c))
+                pose[bone] = np.matmul(translation_matrix(mat_view[:3, 3]), np.matmul(rot, matrix_fix))
+                transform[bone] = mat
+            else:
+                mat = np.matmul(translation_matrix(pos), quat_matrix(quat))
+                pose[bone] = np.matmul(mat, matrix_fix)
+                transform[bone] = mat
+            basis = np.matmul(np.linalg.inv(rest_offset), pose[bone])
+            locations[frame, bone] = basis[:3, 3]
+            rotations[frame, bone] = basis[:3, :3]
+    return (locations, rotations)
+
+def check_solve_keys(parent_indexes, key_indexes, frames = 5, seed = 0):
+    rng = np.random.RandomState(seed)
+    bones_count = len(parent_indexes)
+    keys_count = max(key_indexes) + 1
+    matrix_rest = random_rigid(rng, bones_count)
+    matrix_basis = random_rigid(rng, bones_count)
+    matrix_fix = np.matmul(quat_matrix(np.array((math.cos(-math.pi / 4), 0.0, 0.0, math.sin(-math.pi / 4)))),
+                           quat_matrix(np.array((math.cos(-math.pi / 4), 0.0, math.sin(-math.pi / 4), 0.0))))
+    keys_pos = rng.normal(size = (frames, keys_count, 3))
+    keys_quat = rng.normal(size = (frames, keys_count, 4))
+    keys_quat /= np.linalg.norm(keys_quat, axis = -1)[..., np.newaxis]
+
+    skeleton = class_skeleton([str(index) for index in range(bones_count)], parent_indexes)
+    (locations, quaternions) = util_psa_solve_keys(skeleton, key_indexes, matrix_rest, matrix_basis, matrix_fix,
+                                                   keys_pos, keys_quat)
+    (ref_locations, ref_rotations) = reference_solve_keys(parent_indexes, key_indexes, matrix_rest, matrix_basis,
+                                                          matrix_fix, keys_pos, keys_quat)
+    keyed = np.asarray(key_indexes) >= 0
+    np.testing.assert_allclose(locations[:, keyed], ref_locations[:, keyed], atol = 1e-9)
+    np.testing.assert_allclose(util_quat_to_mat3(quaternions[:, keyed]), ref_rotations[:, keyed], atol = 1e-9)
+    np.testing.assert_allclose(np.linalg.norm(quaternions, axis = -1), 1.0)
+    # bones without keys keep identity
+    assert (locations[:, ~keyed] == 0.0).all()
+    assert (quaternions[:, ~keyed] == (1.0, 0.0, 0.0, 0.0)).all()
+
+def test_solve_keys_chain():
+    check_solve_keys([-1, 0, 1, 2], [0, 1, 2, 3])
+
+def test_solve_keys_keyed_child_of_unkeyed_parent():
+    # bone 3 is keyed, its parent 2 is not, keyed bones 0 and 1 are above 2
+    check_solve_keys([-1, 0, 1, 2, 3], [2, 0, -1, 1, 3])
+
+def test_solve_keys_branches_out_of_order():
+    # children before parents in bone order, keys in other order than bones
+    check_solve_keys([3, 3, 0, -1, 2, 0, 5], [4, -1, 1, 0, 2, -1, 3], seed = 1)
+
+def test_solve_keys_roots():
+    # several roots: keyed root with keyed child, unkeyed root with keyed child, keyed root alone
+    check_solve_keys([-1, 0, -1, 2, -1], [0, 1, -1, 2, 3], seed = 2)
+
+def test_solve_keys_root_rotation_is_not_inverted():
+    # root key is pose bone matrix in armature space (with matrix_fix), its quaternion is not conjugated
+    quat = np.array((math.cos(0.3), math.sin(0.3), 0.0, 0.0))
+    pos = np.array((1.0, 2.0, 3.0))
+    skeleton = class_skeleton(['root'], [-1])
+    (locations, quaternions) = util_psa_solve_keys(skeleton, [0], np.identity(4)[np.newaxis],
+                                                   np.identity(4)[np.newaxis], np.identity(4),
+                                                   pos[np.newaxis, np.newaxis], quat[np.newaxis, np.newaxis])
+    np.testing.assert_allclose(locations[0, 0], pos)
+    np.testing.assert_allclose(quaternions[0, 0], quat)
+
+def test_solve_keys_action_with_less_bones():
+    # psa bones 2 and 3 are after TotalBones of action: their pose bones are without keys
+    key_indexes = util_psa_action_key_indexes(np.array([3, 0, 2, 1]), 2)
+    assert key_indexes.tolist() == [-1, 0, -1, 1]
+    check_solve_keys([-1, 0, 1, 2], key_indexes, seed = 3)
+
+def test_bone_name_index_exact_first():
+    name_index = class_bone_name_index(['Spine', 'spine', 'Head'])
+    # exact names win over case-insensitive ones, then case-insensitive name gets first free bone
+    assert name_index.lookup(['spine', 'Spine', 'HEAD']).tolist() == [1, 0, 2]
+
+def test_bone_name_index_folded_before_stripped():
+    # prefix "bip01 " of most bones: "head" is matched case-insensitive to "head", not to "Bip01 Head"
+    name_index = class_bone_name_index(['Bip01 Head', 'head', 'Bip01 Neck'])
+    assert name_index.prefix == 'bip01 '
+    assert name_index.lookup(['HEAD', 'Bip01 NECK']).tolist() == [1, 2]
+
+def test_bone_name_index_prefix_stripped():
+    name_index = class_bone_name_index(['Bip01 Head', 'Bip01 Neck', 'Bip01 Spine'])
+    assert name_index.lookup(['b_head', 'b_neck', 'b_tail']).tolist() == [0, 1, -1]
+    # prefix of less than half of names is not stripped ("b_head"), names without prefix match stripped ones
+    assert name_index.lookup(['b_head', 'neck', 'spine', 'tail']).tolist() == [-1, 1, 2, -1]
+
+def test_bone_name_index_one_match_per_bone():
+    name_index = class_bone_name_index(['Head', 'Head', 'Neck'])
+    # first bone of same name is used, bone is matched by one name only (exact match first)
+    assert name_index.lookup(['head', 'Head', ' NECK ']).tolist() == [-1, 0, 2]
+    assert name_index.key_indexes(['head', 'Head', ' NECK ']).tolist() == [1, -1, 2]
+
+def reference_roll_z_axis(nor):
+    '''z axis of bone with roll 0, as vec_roll_to_mat3_normalized() of Blender (column 2 of bMatrix)'''
+    (x, y, z) = nor
+    theta = 1.0 + y
+    if theta > 1.0e-5:
+        return np.array((-x * z / theta, -z, 1.0 - z * z / theta))
+    if (x != 0.0 or z != 0.0) and theta > 1.0e-9:
+        theta = x * x + z * z
+        return np.array((2.0 * x * z / theta, -z, (x + z) * (x - z) / theta))
+    # nor is -Y: symmetry by Z axis
+    return np.array((0.0, 0.0, 1.0))
+
+def reference_roll_to_vector(nor, align_axis):
+    '''ED_armature_ebone_roll_to_vector() of Blender, bone by bone'''
+    if abs(np.dot(align_axis, nor)) >= 1.0 - np.finfo(np.float32).eps:
+        return 0.0
+    z_axis = reference_roll_z_axis(nor)
+    align_axis_proj = align_axis - nor * np.dot(align_axis, nor)
+    cos_roll = np.dot(align_axis_proj, z_axis) / (np.linalg.norm(align_axis_proj) * np.linalg.norm(z_axis))
+    roll = math.acos(min(1.0, max(-1.0, cos_roll)))
+    if np.dot(np.cross(z_axis, align_axis_proj), nor) < 0.0:
+        roll = -roll
+    return roll
+
+def rotate_around(vec, axis, angle):
+    '''vec rotated around unit axis (Rodrigues)'''
+    return (vec * math.cos(angle) + np.cross(axis, vec) * math.sin(angle)
+            + axis * np.dot(axis, vec) * (1.0 - math.cos(angle)))
+
+def check_bone_roll(dirs, ups, atol = 1e-6):
+    '''rolls equal reference, z axis of rolled bone points to up (within atol)'''
+    dirs = np.array(dirs, dtype = np.float64)
+    ups = np.array(ups, dtype = np.float64)
+    rolls = util_bone_roll_to_vectors(dirs, ups)
+    for (nor, up, roll) in zip(dirs, ups, rolls):
+        np.testing.assert_allclose(roll, reference_roll_to_vector(nor, up), atol = 1e-6)
+        up_proj = up - nor * np.dot(up, nor)
+        if np.linalg.norm(up_proj) > 1e-3:
+            z_axis = rotate_around(reference_roll_z_axis(nor), nor, roll)
+            np.testing.assert_allclose(z_axis / np.linalg.norm(z_axis), up_proj / np.linalg.norm(up_proj),
+                                       atol = atol)
+    return rolls
+
+def test_bone_roll_general():
+    rng = np.random.RandomState(0)
+    dirs = rng.normal(size = (50, 3))
+    dirs /= np.linalg.norm(dirs, axis = 1)[:, np.newaxis]
+    ups = rng.normal(size = (50, 3))
+    ups /= np.linalg.norm(ups, axis = 1)[:, np.newaxis]
+    check_bone_roll(dirs, ups)
+
+def test_bone_roll_near_neg_y():
+    # 1 + y between 1e-9 and 1e-5: other formula of z axis (approximation, not exactly normal to bone)
+    y = -(1.0 - 1.0e-7)
+    xz = math.sqrt(1.0 - y * y)
+    dirs = [(xz, y, 0.0), (0.0, y, xz), (xz * 0.6, y, -xz * 0.8)]
+    ups = [(0.0, 0.0, 1.0), (1.0, 0.0, 0.0), (0.6, 0.0, 0.8)]
+    check_bone_roll(dirs, ups, atol = 1e-3)
+
+def test_bone_roll_neg_y():
+    dirs = [(0.0, -1.0, 0.0)] * 3
+    ups = [(0.0, 0.0, 1.0), (1.0, 0.0, 0.0), (0.0, 0.0, -1.0)]
+    rolls = check_bone_roll(dirs, ups)
+    np.testing.assert_allclose(np.abs(rolls), (0.0, math.pi / 2, math.pi), atol = 1e-9)
+
+def test_bone_roll_up_along_bone():
+    dirs = [(0.0, 1.0, 0.0), (0.6, 0.0, 0.8), (0.0, -1.0, 0.0)]
+    ups = [(0.0, 1.0, 0.0), (-0.6, 0.0, -0.8), (0.0, -1.0, 0.0)]
+    assert check_bone_roll(dirs, ups).tolist() == [0.0, 0.0, 0.0]